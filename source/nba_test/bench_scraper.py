@@ -0,0 +1,178 @@
+import json
+import random
+import time
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+from table_builder import TableBuilder, ID_COLUMNS, read_dataset, memory_mib, set_dtypes
+from table_parser import PARSERS, get_table_contents, table_from_extract
+
+
+# Micro-benchmarks del scraper sobre tablas sinteticas con el mismo marcado que nba.com/stats
+# Uso: python bench_scraper.py
+
+
+# Genera el html de una tabla Crom_table__p1iZz con n_rows equipos y las categorias indicadas
+def make_table_html(n_rows: int, categories: list[str]) -> str:
+    head = "".join(f'<th field="{c}">{c}</th>' for c in categories)
+    rows = []
+    for i in range(n_rows):
+        cells = "".join(f"<td>{random.uniform(0, 100):.1f}</td>" for _ in categories)
+        rows.append(f"<tr><td> Team {i} </td>{cells}</tr>")
+
+    return (
+        '<html><body><table class="Crom_table__p1iZz">'
+        f'<thead><tr class="Crom_headers__mzI_m"><th field="TEAM_NAME">Team</th>{head}</tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody>'
+        "</table></body></html>"
+    )
+
+
+# Pagina completa: la tabla rodeada de marcado y scripts de relleno, como el page_source de nba.com/stats
+def make_page_html(n_rows: int, categories: list[str], filler_kib: int = 500) -> str:
+    table = make_table_html(n_rows, categories)[len("<html><body>"):-len("</body></html>")]
+    block = '<div class="Block_block__x"><span class="Nav_item__x">nav item</span><a href="/stats/teams">link</a></div>'
+    filler = block * (filler_kib * 1024 // len(block))
+    script = "<script>" + "self.__next_f.push([1,\"chunk\"]);" * (filler_kib * 1024 // 60) + "</script>"
+    return f"<html><head>{script}</head><body>{filler}{table}{filler}</body></html>"
+
+
+# Lo mismo que devuelve stats_page.TABLE_JS en el navegador, calculado aqui para poder comparar sin Chrome
+def script_payload(html: str) -> str:
+    table = BeautifulSoup(html, "html.parser").find("table", class_="Crom_table__p1iZz")
+    fields = [th.get("field").lower() for th in table.find("thead").find("tr").find_all("th")[1:]]
+    rows = [[td.get_text().strip() for td in tr.find_all("td")] for tr in table.find("tbody").find_all("tr")]
+    return json.dumps({"fields": fields, "rows": rows})
+
+
+# Version original de get_table_contents (un pd.concat por fila), se mantiene como referencia
+def legacy_table_contents(html, season, conference, position):
+    soup = BeautifulSoup(html, "html.parser")
+    teams_table = soup.find("table", class_="Crom_table__p1iZz")
+    table_head = teams_table.find("thead")
+    categories = [col.get("field").lower() for col in table_head.find("tr", class_="Crom_headers__mzI_m").find_all("th")[1:]]
+
+    df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + categories)
+    for tr in teams_table.find("tbody").find_all("tr"):
+        team_info = tr.find_all("td")
+        team_name = team_info[0].get_text().strip()
+        team_stats = [float(stats.get_text()) for stats in team_info[1:]]
+        df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
+
+    return df
+
+
+# Version con acumulador columnar
+def builder_table_contents(html, season, conference, position):
+    soup = BeautifulSoup(html, "html.parser")
+    teams_table = soup.find("table", class_="Crom_table__p1iZz")
+    table_head = teams_table.find("thead")
+    categories = [col.get("field").lower() for col in table_head.find("tr", class_="Crom_headers__mzI_m").find_all("th")[1:]]
+
+    table_body = teams_table.find("tbody").find_all("tr")
+    builder = TableBuilder(season=season, conference=conference, position=position, categories=categories, n_rows=len(table_body))
+    for tr in table_body:
+        team_info = tr.find_all("td")
+        team_name = team_info[0].get_text().strip()
+        team_stats = [float(stats.get_text()) for stats in team_info[1:]]
+        builder.add_row(team_name=team_name, team_stats=team_stats)
+
+    return builder.to_dataframe()
+
+
+# Devuelve el tiempo medio (en ms) de ejecutar fn sobre html
+def time_per_table(fn, html: str, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(html, "2024-25", "East", "Guard")
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def bench_row_builder():
+    categories = [f"stat_{i}" for i in range(18)]
+    print("[BENCH] get_table_contents (ms por tabla)")
+    for n_rows in [15, 30, 100, 500]:
+        html = make_table_html(n_rows=n_rows, categories=categories)
+        repeats = max(3, 300 // n_rows)
+        legacy = time_per_table(legacy_table_contents, html, repeats)
+        builder = time_per_table(builder_table_contents, html, repeats)
+        print(f"  filas={n_rows:4d}  concat={legacy:8.2f}  builder={builder:8.2f}  x{legacy / builder:.1f}")
+
+
+# page_source completo + get_table_contents frente a la tabla extraida en el navegador (TABLE_JS) + json.
+# Solo mide lo que pasa por el protocolo de WebDriver y el parseo en Python, no el tiempo del script en el navegador.
+def bench_in_browser_extraction(repeats: int = 5):
+    categories = [f"stat_{i}" for i in range(18)]
+    html = make_page_html(n_rows=30, categories=categories)
+
+    print("[BENCH] page_source + get_table_contents vs execute_script(TABLE_JS)")
+    for cats in [[], ["stat_3", "stat_7"]]:
+        payload = script_payload(html)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            get_table_contents(html, "2024-25", "East", "Guard", cats_of_interest=cats)
+        html_ms = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            table_from_extract(json.loads(payload), "2024-25", "East", "Guard", cats_of_interest=cats)
+        script_ms = (time.perf_counter() - start) / repeats * 1000
+
+        html_kib = len(html.encode("utf-8")) / 1024
+        script_kib = len(payload.encode("utf-8")) / 1024
+        print(f"  categorias={len(cats) or len(categories):2d}  bytes: html={html_kib:8.1f} KiB  script={script_kib:6.1f} KiB  x{html_kib / script_kib:.0f}")
+        print(f"                 parseo: html={html_ms:8.2f} ms   script={script_ms:6.2f} ms   x{html_ms / script_ms:.0f}")
+
+
+# Tiempo de parseo de una pagina completa con cada parser de table_parser
+def bench_parsers(repeats: int = 5):
+    categories = [f"stat_{i}" for i in range(18)]
+    html = make_page_html(n_rows=30, categories=categories)
+
+    print("[BENCH] get_table_contents sobre la pagina completa (ms por pagina)")
+    times = {}
+    for name in PARSERS:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            get_table_contents(html, "2024-25", "East", "Guard", parser=name)
+        times[name] = (time.perf_counter() - start) / repeats * 1000
+        print(f"  {name:5s} = {times[name]:8.2f} ms")
+    print(f"  bs4/lxml = x{times['bs4'] / times['lxml']:.0f}")
+
+
+# Memoria del dataset completo con columnas object (como quedaba tras np.array) frente a tipos reales
+def bench_dataset_memory(path: str = "../../dataset/nba_test_dataset.csv"):
+    typed = read_dataset(path)
+    as_strings = typed.astype(str).astype(object)
+    as_csv = pd.read_csv(path)
+
+    print(f"[BENCH] memoria del dataset ({len(typed)} filas)")
+    print(f"  object (np.array)       = {memory_mib(as_strings):6.2f} MiB")
+    print(f"  read_csv por defecto    = {memory_mib(as_csv):6.2f} MiB")
+    print(f"  float64 + category      = {memory_mib(typed):6.2f} MiB")
+
+    # Merge de los tres endpoints como en execute_scraping
+    stats = [c for c in typed.columns if c not in ID_COLUMNS]
+    parts = [typed[ID_COLUMNS + stats[:18]], typed[ID_COLUMNS + stats[18:20]], typed[ID_COLUMNS + stats[20:]]]
+    parts_str = [p.astype(str).astype(object) for p in parts]
+    for name, (a, b, c) in [("object", parts_str), ("tipado", parts)]:
+        start = time.perf_counter()
+        merged = pd.merge(pd.merge(a, b, on=ID_COLUMNS, how="left"), c, on=ID_COLUMNS, how="left")
+        print(f"  merge {name:7s} = {(time.perf_counter() - start) * 1000:6.1f} ms")
+    # El merge tipado mantiene las estadisticas en float64 (merge_endpoints vuelve a poner las claves como category)
+    assert (merged[stats].dtypes == "float64").all()
+    assert (set_dtypes(merged)[ID_COLUMNS].dtypes == "category").all()
+
+
+def main():
+    random.seed(0)
+    bench_row_builder()
+    bench_in_browser_extraction()
+    bench_parsers()
+    bench_dataset_memory()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+from selenium.webdriver import ChromeOptions
+from selenium.common.exceptions import WebDriverException
+
+
+# Recursos que no hacen falta para la tabla de estadisticas (patrones de Network.setBlockedURLs)
+BLOCKED_RESOURCES = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+]
+
+# Dominios de terceros (publicidad, analitica, video) que carga nba.com. El banner de cookies
+# (cdn.cookielaw.org / onetrust) no se bloquea, porque el flujo de aceptar cookies lo necesita.
+BLOCKED_DOMAINS = [
+    "doubleclick.net", "googlesyndication.com", "googletagmanager.com", "googletagservices.com",
+    "google-analytics.com", "amazon-adsystem.com", "adsrvr.org", "adnxs.com", "criteo.com",
+    "facebook.net", "facebook.com", "twitter.com", "tiktok.com", "snapchat.com",
+    "scorecardresearch.com", "chartbeat.com", "chartbeat.net", "omtrdc.net", "demdex.net",
+    "everesttech.net", "tiqcdn.com", "nr-data.net", "newrelic.com", "optimizely.com",
+    "branch.io", "segment.io", "brightcove.net", "brightcove.com",
+]
+
+# Bytes transferidos por la pagina desde la ultima medicion (documento + recursos), segun la Resource Timing API.
+# Los recursos de otros dominios sin Timing-Allow-Origin cuentan 0 bytes, asi que es una cota inferior
+TRANSFER_JS = """
+let total = 0;
+let count = 0;
+if (!window.__transferCounted) {
+    for (const e of performance.getEntriesByType('navigation')) { total += e.transferSize || 0; count += 1; }
+    window.__transferCounted = true;
+}
+for (const e of performance.getEntriesByType('resource')) { total += e.transferSize || 0; count += 1; }
+performance.clearResourceTimings();
+return [total, count];
+"""
+
+
+# Configuracion del navegador de Selenium.
+# "default": navegador visible que carga la pagina completa (como hasta ahora).
+# "fast": headless, page_load_strategy eager (driver.get vuelve en DOMContentLoaded; las esperas por la
+# tabla ya son por eventos) y sin imagenes, fuentes, video ni dominios de publicidad/analitica.
+class BrowserProfile():
+
+    def __init__(self, name: str = "default"):
+        assert name in ["default", "fast"]
+        self.name = name
+        self.headless = name == "fast"
+        self.page_load_strategy = "eager" if name == "fast" else "normal"
+        self.blocked_urls = []
+        if name == "fast":
+            self.blocked_urls = BLOCKED_RESOURCES + [f"*{domain}*" for domain in BLOCKED_DOMAINS]
+
+        # Bytes y recursos transferidos en cada combinacion
+        self.transfers = []
+
+
+    # https://developer.chrome.com/docs/chromedriver/capabilities?hl=es-419
+    # capture_network: activa el log de rendimiento de Chrome (para capturar las XHR de la api)
+    # user_data_dir: perfil de Chrome persistente (cache, cookies y almacenamiento local entre ejecuciones)
+    # proxy: url del proxy por el que sale el navegador (Chrome no acepta usuario/contraseña en --proxy-server)
+    def chrome_options(self, user_agent: str, capture_network: bool = False, user_data_dir: str = None, proxy: str = None) -> ChromeOptions:
+        webdriver_options = ChromeOptions()
+        if self.headless:
+            webdriver_options.add_argument("--headless=new")
+            # Tamaño de escritorio, para que la pagina muestre el mismo panel de filtros
+            webdriver_options.add_argument("--window-size=1920,1080")
+        if user_data_dir is not None:
+            webdriver_options.add_argument(f"--user-data-dir={user_data_dir}")
+        if proxy is not None:
+            webdriver_options.add_argument(f"--proxy-server={proxy}")
+        webdriver_options.add_argument(f"--user-agent={user_agent}")
+        # evitar deteccion como bot (https://stackoverflow.com/questions/71885891/urllib3-exceptions-maxretryerror-httpconnectionpoolhost-localhost-port-5958)
+        webdriver_options.add_argument('--disable-blink-features=AutomationControlled')
+        webdriver_options.page_load_strategy = self.page_load_strategy
+        if self.name == "fast":
+            webdriver_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        if capture_network:
+            webdriver_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return webdriver_options
+
+
+    # Activa el bloqueo de recursos en la pestaña actual (los comandos CDP son por pestaña)
+    def prepare_tab(self, driver):
+        if len(self.blocked_urls) == 0:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls})
+        except WebDriverException as e:
+            print(f"[WARN] No se pudo activar el bloqueo de recursos: {e}")
+
+
+    # Mide lo transferido por la pestaña actual desde la ultima medicion
+    def record_transfer(self, driver):
+        try:
+            total, count = driver.execute_script(TRANSFER_JS)
+        except WebDriverException:
+            return
+        self.transfers.append((total, count))
+
+
+    def summary(self) -> str:
+        if len(self.transfers) == 0:
+            return f"perfil={self.name}"
+        mean_kib = sum(t[0] for t in self.transfers) / len(self.transfers) / 1024
+        mean_count = sum(t[1] for t in self.transfers) / len(self.transfers)
+        return f"perfil={self.name} transferido por combinacion={mean_kib:.1f} KiB en {mean_count:.0f} recursos"
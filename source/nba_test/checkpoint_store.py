@@ -0,0 +1,51 @@
+import os
+import re
+import shutil
+
+import pandas as pd
+
+
+# Almacen local de resultados parciales: un fichero pickle por (endpoint, temporada, conferencia, posicion).
+# Cada combinacion se guarda nada mas extraerse, asi si el navegador muere a mitad de ejecucion
+# la siguiente ejecucion solo tiene que pedir las combinaciones que faltan.
+class CheckpointStore():
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(self.path, exist_ok=True)
+
+
+    # Nombre de fichero seguro para cualquier valor de filtro (p.ej. "/teams/box-outs" o "2024-25")
+    @staticmethod
+    def slug(value: str) -> str:
+        return re.sub(r"[^A-Za-z0-9.-]+", "_", value).strip("_")
+
+
+    def file_of(self, sub_url: str, season: str, conference: str, position: str) -> str:
+        return os.path.join(self.path, self.slug(sub_url), f"{self.slug(season)}__{self.slug(conference)}__{self.slug(position)}.pkl")
+
+
+    def has(self, sub_url: str, season: str, conference: str, position: str) -> bool:
+        return os.path.exists(self.file_of(sub_url, season, conference, position))
+
+
+    def save(self, sub_url: str, season: str, conference: str, position: str, df: pd.DataFrame):
+        path = self.file_of(sub_url, season, conference, position)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Escribimos en un temporal y renombramos, para no dejar nunca un checkpoint a medias
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+
+
+    def load(self, sub_url: str, season: str, conference: str, position: str) -> pd.DataFrame:
+        path = self.file_of(sub_url, season, conference, position)
+        if not os.path.exists(path):
+            return None
+        return pd.read_pickle(path)
+
+
+    # Borra todos los checkpoints (al terminar una ejecucion completa)
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.makedirs(self.path, exist_ok=True)
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+
+from table_builder import ID_COLUMNS, set_dtypes, read_dataset
+from stats_api import ENDPOINTS
+
+
+# Actualizacion incremental del dataset: las temporadas pasadas no cambian, asi que solo hace falta
+# extraer las combinaciones (temporada, conferencia, posicion) que faltan en el csv de cada endpoint
+# y las de la temporada en curso, e insertarlas/actualizarlas sobre el dataset existente.
+
+
+# Columnas del dataset que aporta un endpoint (cats_of_interest vacio = todas las de la tabla)
+def endpoint_columns(sub_url: str, cats_of_interest: list[str]) -> list[str]:
+    return cats_of_interest if len(cats_of_interest) > 0 else ENDPOINTS[sub_url]["categories"]
+
+
+def load_existing(path: str) -> pd.DataFrame:
+    if not os.path.exists(path):
+        return None
+    return read_dataset(path)
+
+
+# Combinaciones del grid que hay que extraer para un endpoint: las que no tienen ninguna fila en el dataset
+# existente (o todas si el dataset no tiene las columnas del endpoint), mas las de las temporadas a refrescar.
+# Si la combinacion ya esta, sus columnas vacias son definitivas (p.ej. hustle no existe antes de 2015-16):
+# el dataset solo se escribe cuando se han extraido todas las combinaciones
+def missing_combinations(existing: pd.DataFrame, columns: list[str], grid: list[tuple[str, str, str]],
+                         refresh_seasons: list[str]) -> list[tuple[str, str, str]]:
+    if existing is None or len(existing) == 0 or not set(columns).issubset(existing.columns):
+        return list(grid)
+
+    keys = ID_COLUMNS[1:]
+    present = set(existing[keys].astype(str).itertuples(index=False, name=None))
+
+    refresh_seasons = set(refresh_seasons)
+    return [k for k in grid if k not in present or k[0] in refresh_seasons]
+
+
+# Inserta/actualiza los resultados nuevos de cada endpoint sobre el dataset existente.
+# new_dfs va en el orden de SCRAPING_PLAN: el primer endpoint define las filas (como el LEFT join
+# de merge_endpoints) y el resto solo rellena columnas de filas existentes.
+def upsert(existing: pd.DataFrame, new_dfs: list[pd.DataFrame], columns: list[str], grid: list[tuple[str, str, str]]) -> pd.DataFrame:
+    if existing is None:
+        base = pd.DataFrame(columns=ID_COLUMNS + columns).set_index(ID_COLUMNS)
+    else:
+        base = existing.astype({c: str for c in ID_COLUMNS}).set_index(ID_COLUMNS)
+    base = base.reindex(columns=columns).astype("float64")
+
+    for i, df in enumerate(new_dfs):
+        if df is None or len(df) == 0:
+            continue
+        df = df.astype({c: str for c in ID_COLUMNS}).set_index(ID_COLUMNS)
+        if i == 0:
+            new_rows = df.index.difference(base.index)
+            base = pd.concat([base, pd.DataFrame(index=new_rows, columns=base.columns, dtype="float64")])
+        else:
+            df = df[df.index.isin(base.index)]
+        # Los valores recien extraidos sustituyen a los anteriores
+        base.loc[df.index, df.columns] = df.values
+
+    # Orden del grid (temporada mas reciente primero), manteniendo el orden de equipos dentro de cada combinacion
+    order = {k: i for i, k in enumerate(grid)}
+    output = base.reset_index()
+    output["_order"] = [order.get(k, len(order)) for k in output[ID_COLUMNS[1:]].itertuples(index=False, name=None)]
+    output = output.sort_values("_order", kind="stable").drop(columns="_order").reset_index(drop=True)
+
+    return set_dtypes(output)
@@ -1,282 +1,1107 @@
-from urllib import robotparser
 import pandas as pd
 import time
-import numpy as np
-import random
+import os
+import socket
+import sys
+import argparse
+from urllib.parse import urljoin
+
+import requests
 
-from bs4 import BeautifulSoup
 from selenium import webdriver
-from selenium.webdriver import ChromeOptions, ChromeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import WebDriverException
+
+from table_builder import TableBuilder, ID_COLUMNS, set_dtypes, memory_mib
+from table_parser import PARSERS, ColumnPlanCache
+from result_collector import ResultCollector
+from stats_api import StatsApiClient, STATS_API_URL, ENDPOINTS, CONFERENCES, POSITIONS, season_list, api_request
+from rate_limiter import AdaptiveRateLimiter, THROTTLE_STATUS
+from waits import TableRefreshWait
+from stats_page import StatsPage, PageError
+from robots_cache import RobotsCache
+from checkpoint_store import CheckpointStore
+from snapshot_store import SnapshotStore
+from incremental import endpoint_columns, load_existing, missing_combinations, upsert
+from pipeline import ScrapePipeline, parse_content
+from tab_multiplexer import TabMultiplexer
+from browser_profile import BrowserProfile
+from network_capture import XhrCapture
+from session_store import SessionStore
+from retry_supervisor import RetrySupervisor, RestartError
+from proxy_pool import ProxyPool
+from work_queue import WorkQueue, Heartbeat
+from concurrent.futures import ThreadPoolExecutor, BrokenExecutor
+
+
+# Carpeta para los ficheros de cache/estado que se reutilizan entre ejecuciones
+CACHE_DIR = "cache"
+
+# Ficheros del dataset (separado por comas y por punto y coma para Excel)
+DATASET_PATH = os.path.join("..", "..", "dataset", "nba_test_dataset.csv")
+DATASET_EXCEL_PATH = os.path.join("..", "..", "dataset", "nba_test_dataset_excel.csv")
+
+
+# Endpoints que forman el dataset final y categorias de interes de cada uno (vacio = todas)
+SCRAPING_PLAN = [
+    ("/teams/shooting", []),
+    ("/teams/hustle", ["contested_shots_2pt", "contested_shots_3pt"]),
+    ("/teams/box-outs", ["off_boxouts", "def_boxouts"]),
+]
+
+
+# Todas las combinaciones (temporada, conferencia, posicion), en el mismo orden en que se recorren los desplegables
+def build_grid() -> list[tuple[str, str, str]]:
+    return [(season, conf, pos) for season in season_list() for conf in CONFERENCES for pos in POSITIONS]
+
+
+# Reparte el grid en n_shards trozos contiguos, asi cada worker recorre pocas temporadas distintas
+def partition_grid(grid: list, n_shards: int) -> list[list]:
+    size, extra = divmod(len(grid), n_shards)
+    shards = []
+    start = 0
+    for i in range(n_shards):
+        end = start + size + (1 if i < extra else 0)
+        shards.append(grid[start:end])
+        start = end
+    return shards
+
+
+# Une los DataFrames de cada endpoint (en el orden de SCRAPING_PLAN) con LEFT joins sobre las columnas identificativas
+def merge_endpoints(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+    output = dfs[0].reset_index(drop=True)
+    for df in dfs[1:]:
+        output = pd.merge(output, df.reset_index(drop=True), on=ID_COLUMNS, how="left")
+    # El merge puede devolver las claves como object, dejamos el resultado con sus tipos reales
+    return set_dtypes(output)
+
+
+# Segundos a partir de los que una combinacion se considera lenta. Con selenium cada combinacion incluye
+# renderizar la tabla, asi que tarda mas que con la api
+SLOW_LATENCY = {"selenium": 10.0, "http": 3.0}
+
+
+# Limitador de peticiones compartido por todos los scrapers (hilos o procesos) que usen el mismo fichero.
+# rate: maximo de combinaciones por segundo
+def build_limiter(backend: str = "selenium", rate: float = 1.0, path: str = os.path.join(CACHE_DIR, "rate_limiter.json")) -> AdaptiveRateLimiter:
+    if backend == "replay":
+        return None
+    return AdaptiveRateLimiter(max_rate=rate, slow_latency=SLOW_LATENCY[backend], path=path)
+
+
+# Tabla vacia (sin equipos) con las columnas de un endpoint, para las combinaciones en las que falla
+def empty_endpoint_table(sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str) -> pd.DataFrame:
+    return TableBuilder(season=season, conference=conf, position=pos,
+                        categories=endpoint_columns(sub_url, cats_of_interest), n_rows=0).to_dataframe()
+
+
+# Actualiza el dataset de dataset_path extrayendo solo las combinaciones que faltan y las de la temporada en curso.
+# scraper puede ser un NBAScraper o un NBAScraperPool (ambos aceptan combinations en extract_data)
+def incremental_update(scraper, dataset_path: str = DATASET_PATH) -> pd.DataFrame:
+    existing = load_existing(dataset_path)
+    grid = build_grid()
+    # La temporada en curso (la primera del desplegable) se vuelve a extraer siempre
+    refresh_seasons = [grid[0][0]] if len(grid) > 0 else []
+
+    columns = []
+    new_dfs = []
+    for sub_url, cats_of_interest in SCRAPING_PLAN:
+        endpoint_cols = endpoint_columns(sub_url, cats_of_interest)
+        columns += endpoint_cols
+        pending = missing_combinations(existing, endpoint_cols, grid, refresh_seasons)
+        print(f"[INFO] {sub_url}: {len(pending)} de {len(grid)} combinaciones pendientes")
+        if len(pending) == 0:
+            new_dfs.append(None)
+            continue
+        new_dfs.append(scraper.extract_data(sub_url=sub_url, cats_of_interest=cats_of_interest, combinations=pending))
+
+    return upsert(existing, new_dfs, columns, grid)
+
+
+# Guarda el dataset en ambos formatos de csv
+def write_csv(df: pd.DataFrame):
+    df.to_csv(DATASET_PATH, sep=",", index=False)
+    df.to_csv(DATASET_EXCEL_PATH, sep=";", index=False)
+
+
+# Encola un trabajo por (endpoint, combinacion) del plan, en el orden del dataset
+def enqueue_plan(queue: WorkQueue, plan: list[tuple[str, list[str]]] = SCRAPING_PLAN, grid: list[tuple[str, str, str]] = None) -> int:
+    grid = build_grid() if grid is None else grid
+    return queue.enqueue([(sub_url, season, conf, pos) for season, conf, pos in grid for sub_url, _ in plan])
+
+
+# Worker de la cola: coge lotes de trabajos de un mismo endpoint, los extrae con scraper (NBAScraper) y cada
+# combinacion queda escrita como una particion en results (un CheckpointStore, p.ej. en un directorio compartido).
+# Termina cuando no quedan trabajos, si el navegador muere (los trabajos sin resultado de su lote vuelven a la
+# cola para otros workers) o tras max_empty_batches lotes seguidos sin ningun resultado
+def run_queue_worker(scraper, queue: WorkQueue, results: CheckpointStore, worker: str, batch_size: int = 12,
+                     plan: list[tuple[str, list[str]]] = SCRAPING_PLAN, max_empty_batches: int = 3):
+    cats_of = dict(plan)
+    # Cada combinacion extraida se guarda directamente como particion del resultado
+    scraper.checkpoints = results
+    empty_batches = 0
+
+    while True:
+        jobs = queue.lease(worker, n=batch_size)
+        if len(jobs) == 0:
+            if queue.unfinished() == 0:
+                break
+            # Lo que queda lo tienen otros workers: esperamos por si alguno muere y caduca su lease
+            time.sleep(min(30.0, queue.lease_seconds / 3))
+            continue
+
+        sub_url = jobs[0][0]
+        error = None
+        try:
+            with Heartbeat(queue, worker, jobs):
+                scraper.extract_data(sub_url=sub_url, cats_of_interest=cats_of.get(sub_url, []), combinations=[job[1:] for job in jobs])
+        except Exception as e:
+            # Error inesperado del navegador (p.ej. ya no responde): no se sigue con el
+            error = e
+
+        done = 0
+        for job in jobs:
+            if results.has(*job):
+                queue.complete(worker, job)
+                done += 1
+            else:
+                queue.fail(worker, job, "sin resultado" if error is None else str(error))
+        print(f"[INFO] {worker}: {done} de {len(jobs)} trabajos de {sub_url} terminados ({queue.summary()})")
+
+        if error is not None or scraper.aborted:
+            print(f"[ERROR] {worker}: el navegador ya no responde ({error or 'extraccion interrumpida'}), el worker se detiene")
+            break
+
+        empty_batches = 0 if done > 0 else empty_batches + 1
+        if empty_batches >= max_empty_batches:
+            print(f"[ERROR] {worker}: {empty_batches} lotes seguidos sin resultados, el worker se detiene")
+            break
+
+
+# Une las particiones de todos los trabajos en el mismo dataset que extract_plan (el que escribe get_csv).
+# Las combinaciones sin resultado (fallidas o aun pendientes) quedan con las columnas de su endpoint vacias
+def finalize_queue(queue: WorkQueue, results: CheckpointStore, plan: list[tuple[str, list[str]]] = SCRAPING_PLAN) -> pd.DataFrame:
+    if queue.unfinished() > 0:
+        print(f"[WARN] La cola aun tiene trabajos sin terminar ({queue.summary()})")
+    failed = queue.jobs_in_state("failed")
+    if len(failed) > 0:
+        print(f"[WARN] {len(failed)} trabajos fallidos, sus columnas quedan vacias")
+
+    collector = ResultCollector()
+    for season, conf, pos in queue.combinations():
+        dfs = []
+        for sub_url, cats_of_interest in plan:
+            df = results.load(sub_url, season, conf, pos)
+            if df is None:
+                df = empty_endpoint_table(sub_url, cats_of_interest, season, conf, pos)
+            dfs.append(df)
+        collector.append(merge_endpoints(dfs))
+
+    final_df = set_dtypes(collector.to_dataframe())
+    if final_df is not None:
+        final_df = final_df.reset_index(drop=True)
+    return final_df
 
 
 
 
 class NBAScraper():
 
-    def __init__(self, user_agent: str):
-        self.rp = robotparser.RobotFileParser()
+    # backend: "selenium" (navegador + html renderizado), "http" (api JSON de estadisticas, sin navegador)
+    # o "replay" (vuelve a parsear las paginas guardadas en snapshots, sin navegador ni red)
+    # limiter: limitador de peticiones compartido (si no se indica se crea uno con build_limiter, persistido en CACHE_DIR)
+    # proxies: pool de proxies del que este scraper toma uno (con su propio limitador, ademas de limiter)
+    # robots: cache de robots.txt compartida (si no se indica se crea una persistida en CACHE_DIR)
+    def __init__(self, user_agent: str, backend: str = "selenium", api_url: str = STATS_API_URL,
+                 collector_max_bytes: int = None, spill_dir: str = None, limiter: AdaptiveRateLimiter = None,
+                 robots: RobotsCache = None, checkpoints: CheckpointStore = None, snapshots: SnapshotStore = None,
+                 navigation: str = "clicks", extraction: str = "script", parser: str = "lxml",
+                 parse_workers: int = 0, queue_size: int = 8, tabs: int = 1, profile: str = "default",
+                 session: SessionStore = None, worker_id: int = 0, max_attempts: int = 3, restart_after: int = 2,
+                 proxies: ProxyPool = None):
+        assert backend in ["selenium", "http", "replay"]
+        assert extraction in ["script", "html", "xhr"]
+        assert backend != "replay" or snapshots is not None
+
+        self.robots = robots if robots is not None else RobotsCache(user_agent=user_agent, path=os.path.join(CACHE_DIR, "robots.json"))
         self.user_agent = user_agent
         self.base_url = "https://www.nba.com/"
+        self.backend = backend
+        # Como se pasa de una combinacion de filtros a otra con selenium: "url" (parametros de la url) o "clicks" (desplegables)
+        self.navigation = navigation
+        # Como se saca la tabla con selenium: "script" (solo la tabla, extraida en el navegador), "html" (page_source completo)
+        # o "xhr" (JSON de la api que pide la pagina, capturado del log de red del navegador)
+        self.extraction = extraction
+        # Parser del html de las paginas (ver table_parser.PARSERS)
+        self.parser = parser
+        # Plan de columnas de cada endpoint, reutilizado mientras no cambie la cabecera de la tabla
+        self.column_plans = ColumnPlanCache()
+        # Procesos de parseo del pipeline por etapas (0 = se parsea en el mismo hilo que descarga) y tamaño de sus colas
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        # Pestañas por endpoint en el mismo navegador entre las que se reparten las combinaciones (solo selenium)
+        self.tabs = tabs if backend == "selenium" else 1
+        # Configuracion del navegador (ver browser_profile.BrowserProfile)
+        self.profile = BrowserProfile(profile)
         
         self.output = None
 
-        # https://developer.chrome.com/docs/chromedriver/capabilities?hl=es-419
-        webdriver_options = ChromeOptions()
-        # webdriver_options.add_argument("--headless")
-        webdriver_options.add_argument(f"--user-agent={user_agent}")
-        # evitar deteccion como bot (https://stackoverflow.com/questions/71885891/urllib3-exceptions-maxretryerror-httpconnectionpoolhost-localhost-port-5958)
-        webdriver_options.add_argument('--disable-blink-features=AutomationControlled')
-        self.driver = webdriver.Chrome(options=webdriver_options)
+        # Limite de memoria (bytes) para los resultados parciales de cada endpoint; si se supera se vuelcan a spill_dir
+        self.collector_max_bytes = collector_max_bytes
+        self.spill_dir = spill_dir
+
+        # Proxy por el que salen el navegador o la sesion HTTP de este scraper
+        self.proxies = None if backend == "replay" else proxies
+        self.proxy = None if self.proxies is None else self.proxies.acquire()
+        # Ritmo de peticiones adaptativo y comun a todos los workers (con el crawl-delay de robots.txt como suelo).
+        # Con proxies cada peticion pasa ademas por el limitador de su proxy (el presupuesto de esa IP)
+        self.limiter = limiter if limiter is not None else build_limiter(backend)
+        # Intervalo minimo entre peticiones segun el crawl-delay de robots.txt
+        self.min_interval = 0.0
+        # Checkpoints de cada combinacion extraida, para poder reanudar una ejecucion fallida
+        self.checkpoints = checkpoints
+        # Copia comprimida de cada pagina/respuesta descargada, para poder volver a parsearla sin red
+        self.snapshots = snapshots
+        # Perfil de Chrome y cookies persistentes entre ejecuciones (None = navegador limpio en cada ejecucion)
+        self.session = session
+        self.worker_id = worker_id
+        # Se incrementa cuando un navegador no se pudo cerrar: el siguiente usa un perfil nuevo
+        self.profile_generation = 0
+        # Reintentos de cada combinacion con backoff, reiniciando el navegador tras restart_after fallos seguidos.
+        # En modo replay no hay nada transitorio que reintentar
+        self.supervisor = RetrySupervisor(
+            max_attempts=1 if backend == "replay" else max_attempts, restart_after=restart_after,
+            retry_on=(PageError, WebDriverException, requests.RequestException, ValueError),
+        )
+
+        # Combinaciones (endpoint, temporada, conferencia, posicion) que han fallado tras todos los reintentos y si
+        # se ha interrumpido alguna extraccion (navegador caido). Con cualquiera de los dos el resultado esta incompleto
+        self.failed = []
+        self.aborted = False
+
+        self.driver = None
+        self.api = None
+        # Respuestas de la api de la combinacion en curso, por peticion (ver fetch_content)
+        self.api_responses = {}
+        self.refresh_wait = None
+        self.xhr = None
+        # Pestañas abiertas de cada endpoint (sub_url -> [StatsPage, ...]), para volver a abrirlas si se reinicia el navegador
+        self.open_pages = {}
+        if backend == "http":
+            # Sesion HTTP con pool de conexiones contra la api JSON, no hace falta lanzar Chrome
+            self.api = StatsApiClient(user_agent=user_agent, api_url=api_url, proxy=self.proxy_url())
+            return
+        if backend == "replay":
+            return
+
+        self.start_driver()
+
+
+    # Lanza el navegador (y lo que depende de el: esperas de la tabla y captura de las XHR)
+    def start_driver(self):
+        user_data_dir = None if self.session is None else self.session.profile_dir(self.worker_id, self.profile_generation)
+        self.driver = webdriver.Chrome(options=self.profile.chrome_options(self.user_agent, capture_network=self.extraction == "xhr", user_data_dir=user_data_dir,
+                                                                             proxy=self.proxy_url()))
+        if self.session is not None:
+            # Con las cookies de ejecuciones anteriores (o de otros workers) normalmente ya no hay que aceptar el consentimiento
+            print(f"[INFO] {self.session.restore(self.driver)} cookies restauradas en el navegador {self.worker_id}")
 
         # Configuración de timeouts del navegador
         self.driver.set_page_load_timeout(60)  # Máximo 20 segundos para cargar una página
         self.driver.implicitly_wait(5)  # Espera máxima para encontrar elementos antes de lanzar error
-        
+
+        # Espera por eventos del refresco de la tabla (sustituye a los time.sleep fijos)
+        self.refresh_wait = TableRefreshWait(self.driver, timeout=20)
+        if self.extraction == "xhr":
+            self.xhr = XhrCapture(self.driver, timeout=20)
+
+
+    # Cierra el navegador (aunque ya no responda), lanza otro y vuelve a abrir las pestañas de los endpoints.
+    # Las paginas nuevas no tienen ningun filtro seleccionado, asi que la siguiente combinacion los fija todos
+    # Si el proxy ha sido expulsado del pool, el navegador nuevo sale por otro
+    def restart_driver(self):
+        try:
+            if self.session is not None and self.driver is not None:
+                self.session.capture(self.driver)
+            if self.driver is not None:
+                self.driver.quit()
+        except WebDriverException as e:
+            print(f"[WARN] No se pudo cerrar el navegador: {e}")
+            # El Chrome anterior puede seguir vivo y bloqueando su perfil: el nuevo arranca con otro
+            # (las cookies se restauran igual desde el bote comun)
+            if self.session is not None:
+                self.profile_generation += 1
+
+        if self.proxy is not None and self.proxy.evicted:
+            self.switch_proxy()
+        self.start_driver()
+        old_pages = self.open_pages
+        new_pages = self.open_tabs(list(old_pages))
+        # Se actualiza el mismo diccionario, que es el que tienen los bucles de extraccion
+        old_pages.clear()
+        old_pages.update(new_pages)
+        self.open_pages = old_pages
+        print(f"[INFO] Navegador {self.worker_id} reiniciado")
+
+
+    def proxy_url(self) -> str:
+        return None if self.proxy is None else self.proxy.url
+
+
+    # Devuelve el proxy actual al pool y toma otro (con su limitador). Lanza NoProxyError si no queda ninguno sano
+    def switch_proxy(self):
+        old_proxy = self.proxy
+        self.proxies.release(old_proxy)
+        self.proxy = self.proxies.acquire()
+        if self.api is not None:
+            self.api.set_proxy(self.proxy.url)
+        print(f"[INFO] Worker {self.worker_id}: cambio de proxy {old_proxy.url} -> {self.proxy.url}")
+
+
+    # Apunta el resultado de una peticion en los limitadores y en el pool de proxies. Con la api, si el proxy
+    # acaba de ser expulsado se cambia enseguida; con selenium se cambia al reiniciar el navegador
+    def record_response(self, latency: float, throttled: bool = False, failed: bool = False):
+        if self.proxy is None:
+            self.limiter.record(latency, throttled=throttled, failed=failed)
+            return
+        # Con proxies la limitacion es de la IP del proxy: la frena su limitador, y en el comun cuenta como un fallo
+        self.limiter.record(latency, failed=failed or throttled)
+        self.proxy.limiter.record(latency, throttled=throttled, failed=failed)
+        self.proxies.record(self.proxy, latency, ok=not failed, throttled=throttled)
+        if self.proxy.evicted and self.backend == "http":
+            self.switch_proxy()
+
 
     # Comprobar accesibilidad al sitio web
     def check_accessibility(self, url_robots: str, url: str) -> bool:
         # https://docs.python.org/3/library/urllib.robotparser.html
 
-        # Establece en el parser la url a robots.txt
-        self.rp.set_url(url=url_robots)
-        # Parsea robots.txt
-        self.rp.read()
+        # robots.txt se descarga una vez por host y se reutiliza desde la cache mientras no caduque
+        assert RobotsCache.host_of(url_robots) == RobotsCache.host_of(url)
+        self.min_interval = self.robots.min_interval(url)
+        if self.limiter is not None:
+            self.limiter.set_min_interval(self.min_interval)
         # Examina que user_agent pueda acceder en base al robots.txt parseado
-        return self.rp.can_fetch(useragent=self.user_agent, url=url)
+        return self.robots.can_fetch(url)
     
 
-    
-    def extract_data(self, sub_url: str, cats_of_interest: list[str] = [], check_accept_cookies=True) -> pd.DataFrame:
-        url_robots = f"{self.base_url}robots.txt"
-        url_stats = f"{self.base_url}stats{sub_url}"
+    # Añadimos espaciado de peticiones HTTP: antes de cada peticion se espera al limitador comun (y al del proxy)
+    def pause(self):
+        if self.limiter is None:
+            return
+        response_delay = self.limiter.acquire()
+        if self.proxy is not None:
+            response_delay += self.proxy.limiter.acquire()
+        if response_delay > 0:
+            print(f"[INFO] Esperando {response_delay:.2f} segundos antes de la siguiente petición...")
 
-        def get_table_contents(html, season: str, conference: str, position: str, cats_of_interest: list[str] = []):
-            # Creamos objeto BeautifulSoup
-            soup = BeautifulSoup(html, "html.parser")
 
-            # Extraemos la tabla de estadisticas
-            teams_table = soup.find("table", class_="Crom_table__p1iZz")
+    # Indica si un fallo se debe a que el servidor nos esta limitando (429/403 o pagina de bloqueo)
+    def throttled(self, error: Exception, page: StatsPage = None) -> bool:
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in THROTTLE_STATUS
+        # La sesion ya reintenta los 429/5xx: si se agotan los reintentos tambien es que vamos demasiado rapido
+        if isinstance(error, requests.exceptions.RetryError):
+            return True
+        return page is not None and page.blocked()
 
-            # Obtenemos las columnas de cada estadistica
-            table_head = teams_table.find("thead")
 
-            # Crom_headers__mzI_m -> Cabecera de la tabla
-            categories = [col.get("field").lower() for col in table_head.find("tr", class_="Crom_headers__mzI_m").find_all("th")[1:]]
+    # Acumulador de resultados parciales de un endpoint
+    def new_collector(self, sub_url: str) -> ResultCollector:
+        return ResultCollector(
+            max_bytes=self.collector_max_bytes,
+            spill_dir=None if self.spill_dir is None else os.path.join(self.spill_dir, sub_url.strip("/").replace("/", "_")),
+        )
 
-            categories_idx = range(len(categories))
-            if len(cats_of_interest) > 0:
-                # Indices de las categorias de interes dentro de todas las categoria 
-                categories_idx = [categories.index(c) for c in cats_of_interest]
-            
-            if len(cats_of_interest) == 0:
-                cats_of_interest = [categories[i] for i in categories_idx]
-
-            df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + cats_of_interest)
-            table_body = teams_table.find("tbody").find_all("tr")
-            for tr in table_body:
-                team_info = tr.find_all("td")
-                team_name = team_info[0].get_text().strip()
-                # Cogemos unicamente las estadisticas de interes
-                team_stats = [float(team_info[1:][i].get_text()) for i in categories_idx]
-                
-                # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
-                assert len(categories_idx) == len(team_stats)
-                print(team_stats)
-                df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
-            
-            return df
 
-        
-        final_df = None
+    # URLs de robots.txt y de la pagina (o endpoint de la api) de estadisticas
+    def endpoint_urls(self, sub_url: str) -> tuple[str, str]:
+        if self.backend == "http":
+            return urljoin(self.api.api_url, "/robots.txt"), self.api.endpoint_url(sub_url)
+        return f"{self.base_url}robots.txt", f"{self.base_url}stats{sub_url}"
 
-        # Comprobamos accesibilidad a la pagina
-        if self.check_accessibility(url_robots=url_robots, url=url_stats):
-            print(f"{url_stats} visited!")
-            self.driver.get(url_stats)
-            wait = WebDriverWait(self.driver, 20)
 
-            # No aparecerá el boton de aceptar cookies si ya se ha aceptado en el link anterior
-            if check_accept_cookies:
-                try:
-                    # https://stackoverflow.com/questions/64032271/handling-accept-cookies-popup-with-selenium-in-python
-                    print("Waiting...")
-                    wait.until(
-                        EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
-                    ).click()
-                    print("Cookies accepted!")
-                except:
-                    print("Wait failed!")
-                    self.quit_driver()
-                    return
-            
-            # Esperamos para que la accion de aceptar las cookies no se solape con empezar la extraccion de las tablas, o el programa peta
-            time.sleep(5)
+    # Comprueba robots.txt para un endpoint (en modo replay no hay peticiones que comprobar)
+    def endpoint_accessible(self, sub_url: str) -> bool:
+        if self.backend == "replay":
+            return True
+        url_robots, url_stats = self.endpoint_urls(sub_url)
+        if not self.check_accessibility(url_robots=url_robots, url=url_stats):
+            return False
+        print(f"{url_stats} visited!")
+        return True
+
+
+    # Abre la pagina de estadisticas de un endpoint en la pestaña actual (solo backend selenium)
+    # check_accept_cookies=None: se detecta automaticamente si hay que aceptar las cookies
+    def open_page(self, sub_url: str, check_accept_cookies: bool = None) -> StatsPage:
+        if self.backend != "selenium":
+            return None
+        page = StatsPage(self.driver, url=self.endpoint_urls(sub_url)[1], refresh_wait=self.refresh_wait, navigation=self.navigation)
+        self.profile.prepare_tab(self.driver)
+        if page.open(check_accept_cookies=check_accept_cookies) and self.session is not None:
+            # Guardamos enseguida el consentimiento para los demas workers y las siguientes ejecuciones
+            self.session.capture(self.driver)
+        return page
+
+
+    # Abre self.tabs pestañas con la pagina de cada endpoint (la primera en la pestaña actual)
+    def open_tabs(self, sub_urls: list[str], check_accept_cookies: bool = None) -> dict[str, list[StatsPage]]:
+        tabs = {}
+        if self.backend != "selenium":
+            return tabs
+        first = True
+        for sub_url in sub_urls:
+            tabs[sub_url] = []
+            for _ in range(self.tabs):
+                if not first:
+                    self.driver.switch_to.new_window("tab")
+                first = False
+                tabs[sub_url].append(self.open_page(sub_url, check_accept_cookies=check_accept_cookies))
+        self.open_pages = tabs
+        return tabs
 
-            # Cargamos los filtros avanzados para poder hacer búsqueda por conferencias
+
+    # Pestaña principal abierta de un endpoint (None sin selenium)
+    def page_for(self, sub_url: str) -> StatsPage:
+        pages = self.open_pages.get(sub_url)
+        return pages[0] if pages else None
+
+
+    # Cierra todas las pestañas menos la primera y vuelve a ella
+    def close_tabs(self, tabs: dict[str, list[StatsPage]]):
+        handles = [page.handle for pages in tabs.values() for page in pages]
+        if self.driver is None or len(handles) <= 1:
+            return
+        try:
+            for handle in handles[1:]:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            self.driver.switch_to.window(handles[0])
+        except WebDriverException as e:
+            print(f"[WARN] No se pudieron cerrar las pestañas: {e}")
+
+
+    # Combinaciones a recorrer para un endpoint: las del desplegable (selenium), las guardadas (replay)
+    # o todas las temporadas conocidas (http); si se indican combinations, solo esas
+    def endpoint_grid(self, sub_url: str, page: StatsPage = None, combinations: list[tuple[str, str, str]] = None) -> list[tuple[str, str, str]]:
+        if page is not None:
+            grid = page.grid()
+        elif self.backend == "replay":
+            # En el orden de build_grid, el mismo que en la extraccion original
+            order = {k: i for i, k in enumerate(build_grid())}
+            grid = sorted(self.snapshots.combinations(sub_url), key=lambda k: order.get(k, len(order)))
+        else:
+            grid = build_grid()
+
+        if combinations is not None:
+            # Las que la pagina no ofrece tambien se devuelven (al final): get_combination las deja vacias
+            offered = set(grid)
+            requested = set(combinations)
+            grid = [k for k in grid if k in requested] + [k for k in combinations if k not in offered]
+        return grid
+
+
+    # Descarga (o lee del snapshot) el contenido de una combinacion de filtros con el backend configurado.
+    # Devuelve (contenido, tipo) con tipo "json", "table" o "html"
+    def fetch_content(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str, page: StatsPage = None) -> tuple[str, str]:
+        if self.backend == "replay":
+            snapshot = self.snapshots.get(sub_url, season, conf, pos)
+            if snapshot is None:
+                raise KeyError(f"no hay snapshot de {sub_url} {season} {conf} {pos}")
+            return snapshot
+
+        # Con la api, cada peticion se hace una sola vez por combinacion aunque la usen varios endpoints del plan
+        request = None
+        if self.backend == "http":
+            request = api_request(sub_url) + (season, conf, pos)
+            self.api_responses = {k: v for k, v in self.api_responses.items() if k[-3:] == (season, conf, pos)}
+        if request in self.api_responses:
+            content, kind = self.api_responses[request], "json"
+        else:
+            # Cada peticion espera su turno en el limitador, y su resultado ajusta el ritmo
+            self.pause()
+            start = time.monotonic()
             try:
-                print("Intentando abrir Advanced Filters...")
-                toggle_button = wait.until(EC.element_to_be_clickable(
-                    (By.CSS_SELECTOR, "button.StatsAdvancedFiltersPanel_safArrow__EqRgu")
-                ))
-                toggle_button.click()
-                time.sleep(3)  # Pequeña espera para que los filtros se desplieguen correctamente
-                print("Advanced Filters abiertos.")
+                content, kind = self.download(sub_url, cats_of_interest, season, conf, pos, page=page)
             except Exception as e:
-                print("No se pudo abrir el panel de filtros avanzados.")
-                print(str(e))
-                self.quit_driver()
-                return
+                self.record_response(time.monotonic() - start, throttled=self.throttled(e, page), failed=True)
+                raise
+            self.record_response(time.monotonic() - start)
+            if request is not None:
+                self.api_responses[request] = content
+
+        if self.snapshots is not None:
+            self.snapshots.put(sub_url, season, conf, pos, content, kind=kind)
+        return content, kind
+
+
+    # Descarga una combinacion con la api (http) o con el navegador (selenium)
+    def download(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str, page: StatsPage = None) -> tuple[str, str]:
+        if self.backend == "http":
+            return self.api.fetch_raw(sub_url=sub_url, season=season, conference=conf, position=pos), "json"
+        if self.extraction == "xhr":
+            # No hace falta esperar a que se renderice la tabla: basta con la respuesta de la api
+            self.xhr.drain()
+            page.activate()
+            page.start(season, conf, pos)
+            content = self.xhr.wait_for_json(page.handle, ENDPOINTS[sub_url]["endpoint"], season, conf, pos)
+            page.finish(verify=False)
+            return content, "json"
+        page.apply(season, conf, pos)
+        content, kind = self.read_page(page, sub_url, cats_of_interest)
+        self.profile.record_transfer(self.driver)
+        return content, kind
+
+
+    # Contenido de la tabla que muestra ahora la pagina, segun el modo de extraccion
+    def read_page(self, page: StatsPage, sub_url: str, cats_of_interest: list[str]) -> tuple[str, str]:
+        if self.extraction == "xhr":
+            return self.xhr.wait_for_json(page.handle, ENDPOINTS[sub_url]["endpoint"], *page.selected), "json"
+        if self.extraction == "script":
+            return page.read_table(), "table"
+        return page.read_html(), "html"
+
+
+    # Como fetch_content, pero reintentando la combinacion (con la pestaña actual del endpoint, que cambia si
+    # se reinicia el navegador). parse=True devuelve ya el DataFrame (un error de parseo tambien se reintenta)
+    def fetch_retrying(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str, parse: bool = False):
+        def attempt():
+            page = self.page_for(sub_url)
+            try:
+                content, kind = self.fetch_content(sub_url, cats_of_interest, season, conf, pos, page=page)
+                if not parse:
+                    return content, kind
+                return parse_content(content, kind, sub_url, cats_of_interest, season, conf, pos, parser=self.parser, plans=self.column_plans)
+            except Exception:
+                # No sabemos en que estado han quedado los desplegables
+                if page is not None:
+                    page.reset()
+                raise
+
+        restart = self.restart_driver if self.backend == "selenium" else None
+        return self.supervisor.run(attempt, label=f"{sub_url} {season} {conf} {pos}", restart=restart)
+
+
+    # Extrae la tabla de un endpoint para una combinacion de filtros con el backend configurado
+    def fetch_combination(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str) -> pd.DataFrame:
+        return self.fetch_retrying(sub_url, cats_of_interest, season, conf, pos, parse=True)
+
 
-            # Obtenemos el boton para aplicar los filtros
-            get_stats_button = None
+    # Resultado que no hace falta descargar: el guardado en checkpoints, o una tabla vacia si la pagina del endpoint
+    # no ofrece esa combinacion (p.ej. hustle solo tiene temporadas desde 2015-16). None si hay que descargarla
+    def known_combination(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str) -> pd.DataFrame:
+        if self.backend == "replay":
+            # En la extraccion original la pagina no ofrecia la combinacion: quedo apuntado en los snapshots
+            if self.snapshots.kind(sub_url, season, conf, pos) != "empty":
+                return None
+            return empty_endpoint_table(sub_url, cats_of_interest, season, conf, pos)
+
+        if self.checkpoints is not None:
+            df = self.checkpoints.load(sub_url, season, conf, pos)
+            if df is not None:
+                return df
+
+        page = self.page_for(sub_url)
+        if page is None or page.offers(season, conf, pos):
+            return None
+        df = empty_endpoint_table(sub_url, cats_of_interest, season, conf, pos)
+        # Se guarda como cualquier otra combinacion terminada, y en los snapshots para que replay la reconstruya igual
+        if self.checkpoints is not None:
+            self.checkpoints.save(sub_url, season, conf, pos, df)
+        if self.snapshots is not None:
+            self.snapshots.put(sub_url, season, conf, pos, "", kind="empty")
+        return df
+
+
+    # Apunta una combinacion que ha fallado tras todos los reintentos (sus columnas quedan vacias en el resultado)
+    def record_failure(self, sub_url: str, season: str, conf: str, pos: str, error):
+        print(f"[ERROR] {sub_url} {season} {conf} {pos}: {error}")
+        self.failed.append((sub_url, season, conf, pos))
+
+
+    # Interrumpe la extraccion porque el navegador ya no es fiable: el resultado queda incompleto
+    def abort(self, error: Exception):
+        print(str(error))
+        self.aborted = True
+        self.quit_driver()
+
+
+    # La extraccion ha terminado con todas sus combinaciones (ninguna fallida ni interrumpida)
+    def complete(self) -> bool:
+        return not self.aborted and len(self.failed) == 0
+
+
+    # Combinacion ya guardada en checkpoints, o extraida ahora (y guardada). None si falla la extraccion tras
+    # todos los reintentos. Lanza RestartError si no se puede reiniciar el navegador
+    def get_combination(self, sub_url: str, cats_of_interest: list[str], season: str, conf: str, pos: str) -> tuple[pd.DataFrame, bool]:
+        df = self.known_combination(sub_url, cats_of_interest, season, conf, pos)
+        if df is not None:
+            return df, False
+
+        try:
+            df = self.fetch_combination(sub_url, cats_of_interest, season, conf, pos)
+        except (requests.RequestException, ValueError, KeyError, PageError, WebDriverException) as e:
+            self.record_failure(sub_url, season, conf, pos, e)
+            return None, False
+
+        if self.checkpoints is not None and self.backend != "replay":
+            self.checkpoints.save(sub_url, season, conf, pos, df)
+        return df, True
+
+
+    # Recorre el grid con el pipeline por etapas: este hilo solo descarga, el parseo se hace en procesos
+    # aparte y un hilo escritor une los endpoints del plan de cada combinacion y los acumula en collector
+    def run_pipeline(self, plan: list[tuple[str, list[str]]], grid: list[tuple[str, str, str]], collector: ResultCollector):
+        pending = []
+
+        def write(meta, df, error):
+            sub_url, cats_of_interest, season, conf, pos, fetched = meta
+            if error is not None:
+                self.record_failure(sub_url, season, conf, pos, error)
+            elif fetched and self.checkpoints is not None and self.backend != "replay":
+                self.checkpoints.save(sub_url, season, conf, pos, df)
+            if df is None:
+                # Si falla un endpoint, sus columnas quedan vacias para esta combinacion
+                df = empty_endpoint_table(sub_url, cats_of_interest, season, conf, pos)
+            pending.append(df)
+            if len(pending) == len(plan):
+                collector.append(merge_endpoints(pending))
+                pending.clear()
+
+        pipeline = ScrapePipeline(write, parse_workers=self.parse_workers, queue_size=self.queue_size)
+        pipeline.start()
+        try:
+            try:
+                self.submit_grid(pipeline, plan, grid)
+            finally:
+                pipeline.close()
+        except (PageError, RestartError) as e:
+            self.abort(e)
+        except BrokenExecutor as e:
+            # Ha muerto un proceso de parseo (p.ej. por falta de memoria): lo que falta queda para la siguiente ejecucion
+            print(f"[ERROR] El pool de parseo ha fallado: {e}")
+            self.aborted = True
+        print(f"[INFO] {pipeline.summary()}")
+
+
+    # Etapa de descarga del pipeline: envia cada (combinacion, endpoint) del grid, ya descargado o ya conocido
+    def submit_grid(self, pipeline: ScrapePipeline, plan: list[tuple[str, list[str]]], grid: list[tuple[str, str, str]]):
+        for season, conf, pos in grid:
+            for sub_url, cats_of_interest in plan:
+                meta = (sub_url, cats_of_interest, season, conf, pos)
+                df = self.known_combination(sub_url, cats_of_interest, season, conf, pos)
+                if df is not None:
+                    pipeline.submit(meta + (False,), result=df)
+                    continue
+                try:
+                    content, kind = self.fetch_retrying(sub_url, cats_of_interest, season, conf, pos)
+                except (requests.RequestException, ValueError, KeyError, PageError, WebDriverException) as e:
+                    self.record_failure(sub_url, season, conf, pos, e)
+                    pipeline.submit(meta + (False,), result=None)
+                    continue
+                pipeline.submit(meta + (True,), args=(content, kind, sub_url, cats_of_interest, season, conf, pos, self.parser))
+
+
+    # Recorre el grid repartiendo las combinaciones entre las pestañas abiertas de cada endpoint.
+    # Las combinaciones terminan en cualquier orden, pero se acumulan en collector en el orden del grid
+    def run_tabs(self, plan: list[tuple[str, list[str]]], grid: list[tuple[str, str, str]], tabs: dict[str, list[StatsPage]], collector: ResultCollector):
+        cats_of = dict(plan)
+        results = {}
+        jobs = []
+        for i, (season, conf, pos) in enumerate(grid):
+            for j, (sub_url, cats_of_interest) in enumerate(plan):
+                df = self.known_combination(sub_url, cats_of_interest, season, conf, pos)
+                if df is not None:
+                    results[(i, j)] = df
+                else:
+                    jobs.append(((i, j), sub_url, season, conf, pos))
+
+        next_combination = 0
+
+        # Une y acumula las combinaciones consecutivas que ya tienen todos sus endpoints
+        def emit_ready():
+            nonlocal next_combination
+            while next_combination < len(grid) and all((next_combination, j) in results for j in range(len(plan))):
+                collector.append(merge_endpoints([results.pop((next_combination, j)) for j in range(len(plan))]))
+                next_combination += 1
+
+        def harvest(job, page, error, elapsed):
+            key, sub_url, season, conf, pos = job
+            df = None
+            self.record_response(elapsed, throttled=error is not None and page.blocked(), failed=error is not None)
+            if error is None:
+                try:
+                    content, kind = self.read_page(page, sub_url, cats_of[sub_url])
+                    self.profile.record_transfer(self.driver)
+                    if self.snapshots is not None:
+                        self.snapshots.put(sub_url, season, conf, pos, content, kind=kind)
+                    df = parse_content(content, kind, sub_url, cats_of[sub_url], season, conf, pos, parser=self.parser, plans=self.column_plans)
+                except (ValueError, KeyError) as e:
+                    error = e
+            if error is not None:
+                self.record_failure(sub_url, season, conf, pos, error)
+                # Si falla un endpoint, sus columnas quedan vacias para esta combinacion
+                df = empty_endpoint_table(sub_url, cats_of[sub_url], season, conf, pos)
+            elif self.checkpoints is not None:
+                self.checkpoints.save(sub_url, season, conf, pos, df)
+            results[key] = df
+            emit_ready()
+
+        emit_ready()
+        if self.xhr is not None:
+            self.xhr.drain()
+        multiplexer = TabMultiplexer(tabs, timeout=self.refresh_wait.timeout)
+        try:
+            # Cada carga espera su turno en el limitador
+            multiplexer.run(jobs, harvest, before_start=self.pause)
+        except PageError as e:
+            self.abort(e)
+        print(f"[INFO] {multiplexer.summary()}")
+
+
+    # combinations: si se indica, solo se extraen esas combinaciones (temporada, conferencia, posicion)
+    def extract_data(self, sub_url: str, cats_of_interest: list[str] = [], check_accept_cookies=None,
+                     combinations: list[tuple[str, str, str]] = None) -> pd.DataFrame:
+        final_df = None
+        collector = self.new_collector(sub_url)
+
+        # Comprobamos accesibilidad a la pagina
+        if self.endpoint_accessible(sub_url):
             try:
-                for button in self.driver.find_elements(by=By.CLASS_NAME, value="Button_button__L2wUb"):
-                    if button.text.lower() == "get stats":
-                        get_stats_button = button
-            except:
-                print("No se pudo acceder a los botones.")
-                self.quit_driver()
+                tabs = self.open_tabs([sub_url], check_accept_cookies=check_accept_cookies)
+            except PageError as e:
+                self.abort(e)
                 return
-            
-            # Nos aseguramos de tener boton para aplicar los filtros
-            assert get_stats_button != None
-            
-            # Obtenemos el elemento que contiene todos los filtros
-            overall_filters = self.driver.find_element(by=By.CLASS_NAME, value="nba-stats-primary-split-block")
-            # Obtenemos los filtros que aparecen al inicio
-            initial_filters = overall_filters.find_elements(by=By.CLASS_NAME, value="DropDown_label__lttfI")
-
-            # Obtenemos todas las temporadas
-            season_options = []
-            for filt in initial_filters:
-                tag = filt.find_element(by=By.TAG_NAME, value="p").text
-                if tag.upper() == "SEASON":
-                    season_options = filt.find_elements(by=By.TAG_NAME, value="option")
-                    break
-            
-            # Obtenemos todas las conferencias
-            conference_options = []
-            for filt in initial_filters:
-                tag = filt.find_element(by=By.TAG_NAME, value="p").text
-                if tag.upper() == "CONFERENCE":
-                        conference_options = [
-                            opt for opt in filt.find_elements(by=By.TAG_NAME, value="option")
-                            if opt.text in ["East", "West"]
-                        ]
-                        break
-            
-            # Obtenemos todas las posiciones de jugador
-            positions_options = []
-            for filt in initial_filters:
-                tag = filt.find_element(by=By.TAG_NAME, value="p").text
-                if tag.upper() == "POSITION":
-                        positions_options = [
-                            opt for opt in filt.find_elements(by=By.TAG_NAME, value="option")
-                            if opt.text in ["Center", "Guard", "Forward"]
-                        ]
-                        break
-            
+            page = tabs[sub_url][0] if sub_url in tabs else None
+
+            grid = self.endpoint_grid(sub_url, page=page, combinations=combinations)
+            if self.checkpoints is not None:
+                done = sum(self.checkpoints.has(sub_url, *k) for k in grid)
+                print(f"[INFO] {sub_url}: {done} combinaciones recuperadas de checkpoints, {len(grid) - done} pendientes")
 
             # Iteramos por todas las combinaciones de filtros
-            for season_op in season_options:
-                season_text = season_op.text
+            if self.tabs > 1:
+                self.run_tabs([(sub_url, cats_of_interest)], grid, tabs, collector)
+                grid = []
+            elif self.parse_workers > 0:
+                self.run_pipeline([(sub_url, cats_of_interest)], grid, collector)
+                grid = []
+            for season, conf, pos in grid:
                 try:
-                    wait.until(EC.element_to_be_clickable(season_op)).click()
-                    time.sleep(1)
-                except:
-                    print("Wait failed!")
-                    self.quit_driver()
-                
-                for conf_op in conference_options:
-                    conf_text = conf_op.text
-                    try:
-                        wait.until(EC.element_to_be_clickable(conf_op)).click()
-                        time.sleep(1)
-                    except:
-                        print("Wait failed!")
-                        self.quit_driver()
-                    
-                    for pos_op in positions_options:
-                        pos_text = pos_op.text
-                        time.sleep(1)
-                        try:
-                            wait.until(EC.element_to_be_clickable(pos_op)).click()
-                        except:
-                            print("Wait failed!")
-                            self.quit_driver()
-                        
-                        # Aplicamos los filtros
-                        try:
-                            wait.until(EC.element_to_be_clickable(get_stats_button)).click()
-                        except:
-                            print("Wait failed!")
-                            self.quit_driver()
-
-                        time.sleep(1)
-                        # Esperamos a que la tabla sea visible
-                        wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "Crom_table__p1iZz")))
-                        # Extraemos el dataframe inicial
-                        html = self.driver.page_source
-
-                        curr_df = get_table_contents(html=html, season=season_text, conference=conf_text, position=pos_text, cats_of_interest=cats_of_interest)
-                        if final_df is None:
-                            final_df = curr_df
-                        else:
-                            final_df = pd.concat([final_df, curr_df])
-
-                        # Añadimos espaciado de peticiones HTTP:
-                        # Introducimos un retraso un retraso aleatorio, así simulamos comportamiento más humano
-                        response_delay = random.uniform(1.0, 1.5)
-                        print(f"[INFO] Esperando {response_delay:.2f} segundos antes de la siguiente petición...")
-                        time.sleep(response_delay)
-            
+                    curr_df, _ = self.get_combination(sub_url, cats_of_interest, season, conf, pos)
+                except (PageError, RestartError) as e:
+                    self.abort(e)
+                    break
+                collector.append(curr_df)
+
+            # Construimos el DataFrame del endpoint una unica vez
+            final_df = collector.to_dataframe()
+            print(f"[INFO] {sub_url}: {collector.memory_profile()}")
+            if self.refresh_wait is not None:
+                print(f"[INFO] {sub_url}: {self.refresh_wait.summary()}")
+                print(f"[INFO] {sub_url}: {self.profile.summary()}")
+            if self.xhr is not None:
+                print(f"[INFO] {sub_url}: {self.xhr.summary()}")
+            print(f"[INFO] {sub_url}: {self.supervisor.summary()}")
+            if self.limiter is not None:
+                print(f"[INFO] {sub_url}: {self.limiter.summary()}")
+            # Con pipeline los planes de columnas estan en los procesos de parseo
+            if self.parse_workers == 0:
+                print(f"[INFO] {sub_url}: {self.column_plans.summary()}")
+            collector.cleanup()
+            self.close_tabs(tabs)
 
         return final_df
 
 
+    # Extraccion en una sola pasada: cada combinacion de filtros se recorre una vez y se extraen todos
+    # los endpoints del plan para ella, emitiendo directamente una fila ya unida por equipo.
+    # Con selenium cada endpoint tiene sus pestañas abiertas (con los filtros desplegados) durante toda la pasada.
+    def extract_plan(self, plan: list[tuple[str, list[str]]] = SCRAPING_PLAN, combinations: list[tuple[str, str, str]] = None) -> pd.DataFrame:
+        plan = [(sub_url, cats) for sub_url, cats in plan if self.endpoint_accessible(sub_url)]
+        if len(plan) == 0:
+            self.aborted = True
+            return None
 
-    def execute_scraping(self):
-        df1 = self.extract_data(sub_url="/teams/shooting", check_accept_cookies=True)
-        df2 = self.extract_data(sub_url="/teams/hustle", cats_of_interest=["contested_shots_2pt", "contested_shots_3pt"], check_accept_cookies=False)
-        df1 = df1.reset_index(drop=True)
-        df2 = df2.reset_index(drop=True)
+        try:
+            tabs = self.open_tabs([sub_url for sub_url, _ in plan])
+        except PageError as e:
+            self.abort(e)
+            return
+        pages = {sub_url: pages[0] for sub_url, pages in tabs.items()}
+
+        first_url = plan[0][0]
+        grid = self.endpoint_grid(first_url, page=pages.get(first_url), combinations=combinations)
+        collector = self.new_collector("plan")
+        print(f"[INFO] Extraccion en una pasada: {len(grid)} combinaciones x {len(plan)} endpoints")
+
+        if self.tabs > 1:
+            self.run_tabs(plan, grid, tabs, collector)
+            grid = []
+        elif self.parse_workers > 0:
+            self.run_pipeline(plan, grid, collector)
+            grid = []
+        for season, conf, pos in grid:
+            dfs = []
+            try:
+                for sub_url, cats_of_interest in plan:
+                    df, _ = self.get_combination(sub_url, cats_of_interest, season, conf, pos)
+                    if df is None:
+                        # Si falla un endpoint, sus columnas quedan vacias para esta combinacion
+                        df = empty_endpoint_table(sub_url, cats_of_interest, season, conf, pos)
+                    dfs.append(df)
+            except (PageError, RestartError) as e:
+                self.abort(e)
+                break
+            collector.append(merge_endpoints(dfs))
 
-        df3 = pd.merge(df1, df2, on=["Team", "Season", "Conference", "Position"], how="left")
+        final_df = set_dtypes(collector.to_dataframe())
+        if final_df is not None:
+            final_df = final_df.reset_index(drop=True)
+        print(f"[INFO] plan: {collector.memory_profile()}")
+        if self.backend == "selenium":
+            print(f"[INFO] plan: {self.profile.summary()}")
+        if self.xhr is not None:
+            print(f"[INFO] plan: {self.xhr.summary()}")
+        print(f"[INFO] plan: {self.supervisor.summary()}")
+        if self.limiter is not None:
+            print(f"[INFO] plan: {self.limiter.summary()}")
+        if self.proxies is not None:
+            print(f"[INFO] plan: {self.proxies.summary()}")
+        # Con pipeline los planes de columnas estan en los procesos de parseo
+        if self.parse_workers == 0:
+            print(f"[INFO] plan: {self.column_plans.summary()}")
+        collector.cleanup()
 
-        df4 = self.extract_data(sub_url="/teams/box-outs", cats_of_interest=["off_boxouts", "def_boxouts"], check_accept_cookies=False)
-        df4 = df4.reset_index(drop=True)
+        # Cerramos las pestañas extra y volvemos a la principal
+        self.close_tabs(tabs)
 
-        print(df3)
-        print(df4)
-        self.output = pd.merge(df3, df4, on=["Team", "Season", "Conference", "Position"], how="left")
+        return final_df
+
+
+
+    def execute_scraping(self):
+        # Una sola pasada por el grid de filtros para todos los endpoints del plan
+        self.output = self.extract_plan(SCRAPING_PLAN)
         print(self.output) 
+        if self.output is not None:
+            print(f"[INFO] Memoria del dataset final: {memory_mib(self.output):.2f} MiB")
+        self.report_incomplete()
+
+
+
+    # Modo incremental: solo extrae lo que falta en el dataset existente y la temporada en curso
+    def execute_incremental(self, dataset_path: str = DATASET_PATH):
+        self.output = incremental_update(self, dataset_path=dataset_path)
+        print(self.output)
+        self.report_incomplete()
+
+
+    def report_incomplete(self):
+        if self.aborted:
+            print("[ERROR] La extraccion se ha interrumpido antes de terminar el grid")
+        if len(self.failed) > 0:
+            print(f"[ERROR] {len(self.failed)} combinaciones han fallado tras todos los reintentos")
 
 
 
     # Cerrar driver
     def quit_driver(self):
-        self.driver.quit()
+        if self.driver is not None:
+            if self.session is not None:
+                self.session.capture(self.driver)
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                print(f"[WARN] No se pudo cerrar el navegador: {e}")
+            # Nada debe volver a usar el navegador cerrado
+            self.driver = None
+        if self.api is not None:
+            self.api.close()
+        if self.proxy is not None:
+            self.proxies.release(self.proxy)
+            self.proxy = None
 
 
     # Guardar resultados en ambos formatos de csv
     def get_csv(self):
-        self.output.to_csv("..\\..\\dataset\\nba_test_dataset.csv", sep=",", index=False)
-        self.output.to_csv("..\\..\\dataset\\nba_test_dataset_excel.csv", sep=";", index=False)
+        write_csv(self.output)
             
 
 
+# Pool de N scrapers independientes (un navegador cada uno) que se reparten el grid de filtros.
+# Cada worker recorre su trozo del grid y el coordinador junta los resultados en el mismo orden
+# que la ejecucion secuencial, asi que el output es el mismo que el de NBAScraper.execute_scraping.
+# total_rate es el maximo de combinaciones por segundo entre todos los workers (comparten el mismo limitador).
+class NBAScraperPool():
+
+    def __init__(self, user_agent: str, n_workers: int = 2, total_rate: float = 1.0, **scraper_kwargs):
+        assert n_workers >= 1
+        self.n_workers = n_workers
+        self.output = None
+
+        # Todos los workers comparten la misma cache de robots.txt
+        if scraper_kwargs.get("robots") is None:
+            scraper_kwargs["robots"] = RobotsCache(user_agent=user_agent, path=os.path.join(CACHE_DIR, "robots.json"))
+
+        # Todos los workers comparten el mismo limitador (con proxies, ademas, cada uno pasa por el de su proxy)
+        if scraper_kwargs.get("limiter") is None:
+            scraper_kwargs["limiter"] = build_limiter(scraper_kwargs.get("backend", "selenium"), rate=total_rate)
+
+        # Arrancamos los navegadores en paralelo
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            self.scrapers = list(executor.map(
+                lambda i: NBAScraper(user_agent=user_agent, worker_id=i, **scraper_kwargs),
+                range(n_workers),
+            ))
+
+
+    def extract_data(self, sub_url: str, cats_of_interest: list[str] = [], combinations: list[tuple[str, str, str]] = None) -> pd.DataFrame:
+        shards = partition_grid(build_grid() if combinations is None else list(combinations), self.n_workers)
+
+        def run_shard(scraper: NBAScraper, shard: list) -> pd.DataFrame:
+            if len(shard) == 0:
+                return None
+            return scraper.extract_data(sub_url=sub_url, cats_of_interest=cats_of_interest, combinations=shard)
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            results = list(executor.map(run_shard, self.scrapers, shards))
+
+        collector = ResultCollector()
+        for df in results:
+            collector.append(df)
+        print(f"[INFO] {sub_url} ({self.n_workers} workers): {collector.memory_profile()}")
+        return collector.to_dataframe()
+
+
+    def execute_scraping(self):
+        # Cada worker hace la extraccion en una pasada sobre su trozo del grid
+        shards = partition_grid(build_grid(), self.n_workers)
+
+        def run_shard(scraper: NBAScraper, shard: list) -> pd.DataFrame:
+            if len(shard) == 0:
+                return None
+            return scraper.extract_plan(SCRAPING_PLAN, combinations=shard)
+
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            results = list(executor.map(run_shard, self.scrapers, shards))
+
+        collector = ResultCollector()
+        for df in results:
+            collector.append(df)
+        self.output = set_dtypes(collector.to_dataframe())
+        if self.output is not None:
+            self.output = self.output.reset_index(drop=True)
+        print(self.output)
+
+
+    def execute_incremental(self, dataset_path: str = DATASET_PATH):
+        self.output = incremental_update(self, dataset_path=dataset_path)
+        print(self.output)
+
+
+    def complete(self) -> bool:
+        return all(scraper.complete() for scraper in self.scrapers)
+
+
+    def quit_driver(self):
+        for scraper in self.scrapers:
+            scraper.quit_driver()
+
+
+    def get_csv(self):
+        self.scrapers[0].output = self.output
+        self.scrapers[0].get_csv()
+
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["selenium", "http", "replay"], default="selenium")
+    parser.add_argument("--navigation", choices=["url", "clicks"], default="clicks", help="con selenium: cargar cada combinacion por url (comprobando los tres filtros mostrados) o pulsando los desplegables")
+    parser.add_argument("--extraction", choices=["script", "html", "xhr"], default="script", help="con selenium: extraer solo la tabla en el navegador, descargar el html completo o capturar el JSON de la api que pide la pagina")
+    parser.add_argument("--parser", choices=list(PARSERS), default="lxml", help="parser del html (lxml solo parsea el fragmento de la tabla)")
+    parser.add_argument("--parse-workers", type=int, default=0, help="procesos de parseo en paralelo a la descarga (0 = parsear en el mismo hilo)")
+    parser.add_argument("--queue-size", type=int, default=8, help="tamaño de las colas entre descarga, parseo y escritura")
+    parser.add_argument("--tabs", type=int, default=1, help="con selenium: pestañas por endpoint en el mismo navegador entre las que se reparten las combinaciones")
+    parser.add_argument("--profile", choices=["default", "fast"], default="default", help="con selenium: fast = headless, carga eager y sin imagenes/fuentes/video/publicidad")
+    parser.add_argument("--session-dir", default=os.path.join(CACHE_DIR, "session"), help="perfiles de Chrome y cookies que se reutilizan entre ejecuciones")
+    parser.add_argument("--no-session", action="store_true")
+    parser.add_argument("--retries", type=int, default=3, help="intentos por combinacion (con backoff exponencial y jitter entre ellos)")
+    parser.add_argument("--restart-after", type=int, default=2, help="con selenium: fallos seguidos tras los que se reinicia el navegador")
+    parser.add_argument("--proxies", help="fichero con un proxy por linea (http://host:puerto); cada navegador o sesion sale por uno")
+    parser.add_argument("--proxy-rate", type=float, default=1.0, help="maximo de combinaciones por segundo por proxy")
+    parser.add_argument("--workers", type=int, default=1, help="numero de navegadores en paralelo")
+    parser.add_argument("--rate", type=float, default=1.0, help="maximo de combinaciones por segundo entre todos los workers (y procesos); el ritmo real se adapta a las respuestas")
+    parser.add_argument("--checkpoint-dir", default=os.path.join(CACHE_DIR, "checkpoints"), help="carpeta de checkpoints para reanudar ejecuciones fallidas")
+    parser.add_argument("--no-checkpoints", action="store_true")
+    parser.add_argument("--snapshot-dir", default=os.path.join(CACHE_DIR, "snapshots"), help="carpeta donde se guardan las paginas descargadas")
+    parser.add_argument("--no-snapshots", action="store_true")
+    parser.add_argument("--incremental", action="store_true", help="extraer solo las combinaciones que faltan en el dataset y la temporada en curso")
+    parser.add_argument("--queue-db", help="cola de trabajos SQLite compartida entre maquinas/procesos")
+    parser.add_argument("--queue-role", choices=["enqueue", "work", "finalize"], default="work", help="con --queue-db: encolar el grid, extraer trabajos o unir los resultados en el dataset")
+    parser.add_argument("--results-dir", default=os.path.join(CACHE_DIR, "results"), help="con --queue-db: carpeta (compartida) con las particiones de resultados")
+    parser.add_argument("--worker-name", default=f"{socket.gethostname()}-{os.getpid()}", help="con --queue-db: nombre de este worker")
+    parser.add_argument("--lease", type=float, default=300, help="con --queue-db: segundos que dura el lease de un trabajo sin heartbeat")
+    parser.add_argument("--batch-size", type=int, default=12, help="con --queue-db: trabajos que coge un worker de una vez")
+    args = parser.parse_args()
+
+    # Cola de trabajos: encolar y unir resultados no necesitan navegador
+    queue = None if args.queue_db is None else WorkQueue(args.queue_db, lease_seconds=args.lease)
+    if queue is not None and args.queue_role == "enqueue":
+        print(f"[INFO] {enqueue_plan(queue)} trabajos encolados ({queue.summary()})")
+        return
+    if queue is not None and args.queue_role == "finalize":
+        output = finalize_queue(queue, CheckpointStore(args.results_dir))
+        print(output)
+        write_csv(output)
+        return
+
+    # En modo replay no se descarga nada: no hay nada que reanudar
+    checkpoints = None if args.no_checkpoints or args.backend == "replay" else CheckpointStore(args.checkpoint_dir)
+    snapshots = None if args.no_snapshots else SnapshotStore(args.snapshot_dir)
+    session = None if args.no_session or args.backend != "selenium" else SessionStore(args.session_dir)
+    proxies = None
+    if args.proxies is not None and args.backend != "replay":
+        proxies = ProxyPool(ProxyPool.read_list(args.proxies), rate_per_proxy=args.proxy_rate, slow_latency=SLOW_LATENCY[args.backend], limiter_dir=CACHE_DIR)
+
     # INICIAMOS EL CONTADOR DE TIEMPO
     start_time = time.time()
 
     user_agent_windows = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36"
-    scraper = NBAScraper(user_agent=user_agent_windows)
-    scraper.execute_scraping()
-    scraper.get_csv()
-    scraper.quit_driver()
+    if args.workers > 1:
+        scraper = NBAScraperPool(user_agent=user_agent_windows, n_workers=args.workers, total_rate=args.rate, backend=args.backend, checkpoints=checkpoints, snapshots=snapshots, navigation=args.navigation, extraction=args.extraction, parser=args.parser,
+                                parse_workers=args.parse_workers, queue_size=args.queue_size, tabs=args.tabs, profile=args.profile, session=session,
+                                max_attempts=args.retries, restart_after=args.restart_after, proxies=proxies)
+    else:
+        scraper = NBAScraper(user_agent=user_agent_windows, backend=args.backend, limiter=build_limiter(args.backend, rate=args.rate), proxies=proxies, checkpoints=checkpoints, snapshots=snapshots, navigation=args.navigation, extraction=args.extraction, parser=args.parser,
+                             parse_workers=args.parse_workers, queue_size=args.queue_size, tabs=args.tabs, profile=args.profile, session=session,
+                             max_attempts=args.retries, restart_after=args.restart_after)
+    if queue is not None:
+        # Cada navegador (o sesion) es un worker de la cola; el dataset lo escribe despues --queue-role finalize
+        scrapers = scraper.scrapers if args.workers > 1 else [scraper]
+        results = CheckpointStore(args.results_dir)
+        with ThreadPoolExecutor(max_workers=len(scrapers)) as executor:
+            list(executor.map(lambda i: run_queue_worker(scrapers[i], queue, results, worker=f"{args.worker_name}-{i}", batch_size=args.batch_size),
+                              range(len(scrapers))))
+        scraper.quit_driver()
+    else:
+        if args.incremental:
+            scraper.execute_incremental()
+        else:
+            scraper.execute_scraping()
+        scraper.quit_driver()
+
+        # Con un resultado parcial no se sobrescribe el dataset ni se borran los checkpoints:
+        # la siguiente ejecucion reanuda y solo pide las combinaciones que faltan (incluidas las fallidas)
+        if not scraper.complete():
+            print("[ERROR] Extraccion incompleta: no se escribe el dataset y se conservan los checkpoints para reanudarla")
+            sys.exit(1)
+        scraper.get_csv()
+
+        # La ejecucion ha terminado bien, la siguiente empieza de cero
+        if checkpoints is not None:
+            checkpoints.clear()
 
     # TIEMPO FINAL
     end_time = time.time()
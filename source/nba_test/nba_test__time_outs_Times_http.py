@@ -1,7 +1,6 @@
 from urllib import robotparser
 import pandas as pd
 import time
-import numpy as np
 import random
 
 from bs4 import BeautifulSoup
@@ -11,6 +10,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from table_builder import TableBuilder
+
 
 
 
@@ -66,8 +67,8 @@ class NBAScraper():
             # Crom_headers__mzI_m -> Cabecera perteneciente a FGM, FGA, FG%
             # el apartado field contiene adicionalmente a que rango de tiro pertenece
             categories = [col.get("field") for col in table_head.find("tr", class_="Crom_headers__mzI_m").find_all("th")[1:]]
-            df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + categories)
             table_body = teams_table.find("tbody").find_all("tr")
+            builder = TableBuilder(season=season, conference=conference, position=position, categories=categories, n_rows=len(table_body))
             for tr in table_body:
                 team_info = tr.find_all("td")
                 team_name = team_info[0].get_text()
@@ -75,9 +76,9 @@ class NBAScraper():
                 
                 # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
                 assert len(categories) == len(team_stats)
-                df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
+                builder.add_row(team_name=team_name, team_stats=team_stats)
             
-            return df
+            return builder.to_dataframe()
 
 
         # Comprobamos accesibilidad a la pagina
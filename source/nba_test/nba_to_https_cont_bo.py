@@ -1,8 +1,7 @@
 from urllib import robotparser
 import pandas as pd
 import time
-import numpy as np
-import random
+import os
 
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -11,6 +10,9 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from table_builder import TableBuilder
+from rate_limiter import AdaptiveRateLimiter
+
 
 
 
@@ -23,6 +25,9 @@ class NBAScraper():
         
         self.output = None
 
+        # Ritmo de peticiones adaptativo, compartido con los demas scrapers que se ejecuten a la vez
+        self.limiter = AdaptiveRateLimiter(max_rate=0.5, slow_latency=10.0, path=os.path.join("cache", "rate_limiter.json"))
+
         # TODO: Implementar proxy para que la pagina no me bloquee cuando hago muchas ejecuciones
 
         # https://developer.chrome.com/docs/chromedriver/capabilities?hl=es-419
@@ -46,6 +51,8 @@ class NBAScraper():
         self.rp.set_url(url=url_robots)
         # Parsea robots.txt
         self.rp.read()
+        # El crawl-delay de robots.txt es el intervalo minimo entre peticiones
+        self.limiter.set_min_interval(self.rp.crawl_delay(self.user_agent) or 0.0)
         # Examina que user_agent pueda acceder en base al robots.txt parseado
         return self.rp.can_fetch(useragent=self.user_agent, url=url)
     
@@ -68,8 +75,8 @@ class NBAScraper():
             # Crom_headers__mzI_m -> Cabecera perteneciente a FGM, FGA, FG%
             # el apartado field contiene adicionalmente a que rango de tiro pertenece
             categories = [col.get("field") for col in table_head.find("tr", class_="Crom_headers__mzI_m").find_all("th")[1:]]
-            df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + categories)
             table_body = teams_table.find("tbody").find_all("tr")
+            builder = TableBuilder(season=season, conference=conference, position=position, categories=categories, n_rows=len(table_body))
             for tr in table_body:
                 team_info = tr.find_all("td")
                 team_name = team_info[0].get_text().strip()
@@ -77,9 +84,9 @@ class NBAScraper():
                 
                 # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
                 assert len(categories) == len(team_stats)
-                df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
+                builder.add_row(team_name=team_name, team_stats=team_stats)
             
-            return df
+            return builder.to_dataframe()
         
 
         final_df = None
@@ -199,6 +206,10 @@ class NBAScraper():
                             print("Wait failed!")
                             self.quit_driver()
                         
+                        # Esperamos nuestro turno en el limitador de peticiones comun
+                        self.limiter.acquire()
+                        request_start = time.monotonic()
+
                         # Aplicamos los filtros
                         try:
                             wait.until(EC.element_to_be_clickable(get_stats_button)).click()
@@ -209,6 +220,8 @@ class NBAScraper():
                         time.sleep(1)
                         # Esperamos a que la tabla sea visible
                         wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "Crom_table__p1iZz")))
+                        # Lo que ha tardado la tabla ajusta el ritmo de las siguientes peticiones
+                        self.limiter.record(time.monotonic() - request_start)
                         # Extraemos el dataframe inicial
                         html = self.driver.page_source
 
@@ -217,12 +230,6 @@ class NBAScraper():
                             final_df = curr_df
                         else:
                             final_df = pd.concat([final_df, curr_df])
-
-                        # Añadimos espaciado de peticiones HTTP:
-                        # Introducimos un retraso un retraso aleatorio, así simulamos comportamiento más humano
-                        response_delay = random.uniform(2.0, 5.0)
-                        print(f"[INFO] Esperando {response_delay:.2f} segundos antes de la siguiente petición...")
-                        time.sleep(response_delay)
         
         return final_df
 
@@ -251,8 +258,8 @@ class NBAScraper():
             # Indices de las categorias de interes dentro de todas las categoria 
             categories_idx = [categories.index(c) for c in cats_of_interest]
 
-            df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + cats_of_interest)
             table_body = teams_table.find("tbody").find_all("tr")
+            builder = TableBuilder(season=season, conference=conference, position=position, categories=cats_of_interest, n_rows=len(table_body))
             for tr in table_body:
                 team_info = tr.find_all("td")
                 team_name = team_info[0].get_text().strip()
@@ -262,9 +269,9 @@ class NBAScraper():
                 # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
                 assert len(categories_idx) == len(team_stats)
                 print(team_stats)
-                df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
+                builder.add_row(team_name=team_name, team_stats=team_stats)
             
-            return df
+            return builder.to_dataframe()
 
 
         final_df = None
@@ -385,6 +392,10 @@ class NBAScraper():
                             print("Wait failed!")
                             self.quit_driver()
                         
+                        # Esperamos nuestro turno en el limitador de peticiones comun
+                        self.limiter.acquire()
+                        request_start = time.monotonic()
+
                         # Aplicamos los filtros
                         try:
                             wait.until(EC.element_to_be_clickable(get_stats_button)).click()
@@ -395,6 +406,8 @@ class NBAScraper():
                         time.sleep(1)
                         # Esperamos a que la tabla sea visible
                         wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "Crom_table__p1iZz")))
+                        # Lo que ha tardado la tabla ajusta el ritmo de las siguientes peticiones
+                        self.limiter.record(time.monotonic() - request_start)
                         # Extraemos el dataframe inicial
                         html = self.driver.page_source
 
@@ -403,12 +416,6 @@ class NBAScraper():
                             final_df = curr_df
                         else:
                             final_df = pd.concat([final_df, curr_df])
-
-                        # Añadimos espaciado de peticiones HTTP:
-                        # Introducimos un retraso un retraso aleatorio, así simulamos comportamiento más humano
-                        response_delay = random.uniform(2.0, 5.0)
-                        print(f"[INFO] Esperando {response_delay:.2f} segundos antes de la siguiente petición...")
-                        time.sleep(response_delay)
             
 
         return final_df   
@@ -438,8 +445,8 @@ class NBAScraper():
             # Indices de las categorias de interes dentro de todas las categoria 
             categories_idx = [categories.index(c) for c in cats_of_interest]
 
-            df = pd.DataFrame(columns=["Team", "Season", "Conference", "Position"] + cats_of_interest)
             table_body = teams_table.find("tbody").find_all("tr")
+            builder = TableBuilder(season=season, conference=conference, position=position, categories=cats_of_interest, n_rows=len(table_body))
             for tr in table_body:
                 team_info = tr.find_all("td")
                 team_name = team_info[0].get_text().strip()
@@ -449,9 +456,9 @@ class NBAScraper():
                 # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
                 assert len(categories_idx) == len(team_stats)
                 print(team_stats)
-                df = pd.concat([df, pd.DataFrame(data=np.array([[team_name, season, conference, position] + team_stats]), columns=df.columns)])
+                builder.add_row(team_name=team_name, team_stats=team_stats)
             
-            return df
+            return builder.to_dataframe()
 
 
         final_df = None
@@ -572,6 +579,10 @@ class NBAScraper():
                             print("Wait failed!")
                             self.quit_driver()
                         
+                        # Esperamos nuestro turno en el limitador de peticiones comun
+                        self.limiter.acquire()
+                        request_start = time.monotonic()
+
                         # Aplicamos los filtros
                         try:
                             wait.until(EC.element_to_be_clickable(get_stats_button)).click()
@@ -582,6 +593,8 @@ class NBAScraper():
                         time.sleep(1)
                         # Esperamos a que la tabla sea visible
                         wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "Crom_table__p1iZz")))
+                        # Lo que ha tardado la tabla ajusta el ritmo de las siguientes peticiones
+                        self.limiter.record(time.monotonic() - request_start)
                         # Extraemos el dataframe inicial
                         html = self.driver.page_source
 
@@ -590,12 +603,6 @@ class NBAScraper():
                             final_df = curr_df
                         else:
                             final_df = pd.concat([final_df, curr_df])
-
-                        # Añadimos espaciado de peticiones HTTP:
-                        # Introducimos un retraso un retraso aleatorio, así simulamos comportamiento más humano
-                        response_delay = random.uniform(2.0, 5.0)
-                        print(f"[INFO] Esperando {response_delay:.2f} segundos antes de la siguiente petición...")
-                        time.sleep(response_delay)
             
 
         return final_df
@@ -0,0 +1,111 @@
+import base64
+import json
+import time
+from urllib.parse import urlparse, parse_qs
+
+from selenium.common.exceptions import WebDriverException
+
+from stats_api import POSITIONS
+
+
+# Captura las respuestas JSON de la api de estadisticas que pide la propia pagina (XHR), leyendo el log
+# de rendimiento de Chrome (goog:loggingPrefs performance). Asi se usa la sesion real del navegador
+# (cookies y cabeceras) pero se construye la tabla con los valores exactos del JSON, sin esperar al
+# renderizado ni parsear html.
+# Cada respuesta se indexa por (pestaña, endpoint, temporada, conferencia, posicion), porque hustle y
+# box-outs piden el mismo endpoint y pueden estar cargando a la vez en pestañas distintas.
+class XhrCapture():
+
+    def __init__(self, driver, timeout: float = 20, poll: float = 0.1, api_host: str = "stats.nba.com"):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.api_host = api_host
+
+        # requestId -> clave de las respuestas de la api vistas, y claves cuya descarga ya ha terminado
+        self.requests = {}
+        self.finished = {}
+
+        self.latencies = []
+        self.timeouts = 0
+
+
+    # Clave de una url de la api, o None si no es una peticion de estadisticas
+    def key_of(self, webview: str, url: str) -> tuple:
+        parsed = urlparse(url)
+        if parsed.hostname != self.api_host:
+            return None
+        query = {k.lower(): v[0] for k, v in parse_qs(parsed.query, keep_blank_values=True).items()}
+        endpoint = parsed.path.rstrip("/").split("/")[-1].lower()
+        return (webview, endpoint, query.get("season", ""), query.get("conference", ""), query.get("playerposition", ""))
+
+
+    # Lee las entradas nuevas del log y apunta las respuestas de la api y las que ya han terminado
+    def poll_log(self):
+        try:
+            entries = self.driver.get_log("performance")
+        except WebDriverException:
+            return
+
+        for entry in entries:
+            message = json.loads(entry["message"])
+            event = message["message"]
+            method = event.get("method")
+            params = event.get("params", {})
+            if method == "Network.responseReceived":
+                key = self.key_of(message.get("webview"), params["response"]["url"])
+                if key is not None and params["response"]["status"] == 200:
+                    self.requests[params["requestId"]] = key
+            elif method == "Network.loadingFinished" and params.get("requestId") in self.requests:
+                key = self.requests.pop(params["requestId"])
+                self.finished[key] = params["requestId"]
+
+
+    # Descarta lo que haya en el log (respuestas de cargas anteriores)
+    def drain(self):
+        self.poll_log()
+        self.requests.clear()
+        self.finished.clear()
+
+
+    # Clave terminada que corresponde a key. Si la pestaña del log no coincide con el handle de Selenium
+    # se acepta la unica respuesta de esa combinacion, si solo hay una
+    def find(self, key: tuple) -> tuple:
+        if key in self.finished:
+            return key
+        candidates = [k for k in self.finished if k[1:] == key[1:]]
+        return candidates[0] if len(candidates) == 1 else None
+
+
+    # Espera a que la pestaña handle reciba la respuesta de la api para esa combinacion y devuelve el JSON (texto).
+    # La pestaña tiene que ser la activa (Network.getResponseBody es por pestaña)
+    def wait_for_json(self, handle: str, endpoint: str, season: str, conference: str, position: str) -> str:
+        key = (handle, endpoint.lower(), season, conference, POSITIONS.get(position, position))
+        start = time.monotonic()
+
+        self.poll_log()
+        found = self.find(key)
+        while found is None:
+            if time.monotonic() - start > self.timeout:
+                self.timeouts += 1
+                raise ValueError(f"No llego la respuesta de {endpoint} para {season} {conference} {position}")
+            time.sleep(self.poll)
+            self.poll_log()
+            found = self.find(key)
+        self.latencies.append(time.monotonic() - start)
+
+        request_id = self.finished.pop(found)
+        try:
+            response = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException as e:
+            raise ValueError(f"No se pudo leer la respuesta de {endpoint}: {e}")
+        if response.get("base64Encoded"):
+            return base64.b64decode(response["body"]).decode("utf-8")
+        return response["body"]
+
+
+    def summary(self) -> str:
+        if len(self.latencies) == 0:
+            return f"xhr capturadas=0 timeouts={self.timeouts}"
+        mean = sum(self.latencies) / len(self.latencies)
+        return f"xhr capturadas={len(self.latencies)} timeouts={self.timeouts} espera media={mean:.2f}s"
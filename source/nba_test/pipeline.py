@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+
+from table_parser import ColumnPlanCache, get_table_contents, table_from_extract
+from stats_api import endpoint_table_from_json
+
+
+# Planes de columnas de cada proceso de parseo (cada proceso tiene su propia copia)
+WORKER_PLANS = ColumnPlanCache()
+
+
+# Convierte el contenido descargado de una combinacion (html, json de la api o tabla extraida en el navegador)
+# en su DataFrame. Es una funcion de modulo para poder ejecutarla en otro proceso.
+def parse_content(content: str, kind: str, sub_url: str, cats_of_interest: list[str], season: str, conference: str, position: str,
+                  parser: str = "lxml", plans: ColumnPlanCache = None) -> pd.DataFrame:
+    if kind == "json":
+        return endpoint_table_from_json(json.loads(content), sub_url=sub_url, season=season, conference=conference, position=position, cats_of_interest=cats_of_interest)
+    if kind == "table":
+        return table_from_extract(json.loads(content), season=season, conference=conference, position=position, cats_of_interest=cats_of_interest)
+    return get_table_contents(html=content, season=season, conference=conference, position=position, cats_of_interest=cats_of_interest,
+                              parser=parser, plans=WORKER_PLANS if plans is None else plans, sub_url=sub_url)
+
+
+# Pipeline por etapas con colas acotadas entre ellas:
+#   descarga (hilo que llama a submit) -> cola -> parseo (pool de procesos) -> cola -> escritura (un hilo)
+# La etapa de descarga solo se bloquea si las colas estan llenas (backpressure), nunca por el parseo en si,
+# y los procesos de parseo trabajan mientras el navegador espera a la red.
+# write_fn(meta, resultado, error) se llama en el mismo orden en que se enviaron los elementos.
+class ScrapePipeline():
+
+    def __init__(self, write_fn, parse_workers: int = 2, queue_size: int = 8, processes: bool = True):
+        assert parse_workers >= 1 and queue_size >= 1
+        self.write_fn = write_fn
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.processes = processes
+
+        self.parse_queue = queue.Queue(maxsize=queue_size)
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.executor = None
+        self.threads = []
+        self.error = None
+
+        # Estadisticas: elementos procesados, tiempo bloqueado en cada etapa y ocupacion maxima de las colas
+        self.n_items = 0
+        self.submit_blocked = 0.0
+        self.writer_idle = 0.0
+        self.max_parse_queue = 0
+        self.max_write_queue = 0
+
+
+    def start(self):
+        if self.processes:
+            # spawn: los procesos se crean desde el hilo de parseo, y hacer fork de un proceso con hilos no es seguro
+            self.executor = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+        self.threads = [
+            threading.Thread(target=self.dispatch_loop, daemon=True),
+            threading.Thread(target=self.write_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+
+    # Etapa de descarga: envia un elemento a parsear (args de parse_content) o ya resuelto (result).
+    # Bloquea mientras la cola de parseo este llena
+    def submit(self, meta, args: tuple = None, result=None):
+        if self.error is not None:
+            raise self.error
+        start = time.perf_counter()
+        self.parse_queue.put((meta, args, result))
+        self.submit_blocked += time.perf_counter() - start
+        self.n_items += 1
+        self.max_parse_queue = max(self.max_parse_queue, self.parse_queue.qsize())
+
+
+    # Etapa de parseo: pasa cada elemento al pool y deja el futuro en la cola de escritura (en orden).
+    # Como la cola de escritura esta acotada, nunca hay mas de queue_size + parse_workers elementos en vuelo.
+    # Si el pool falla (p.ej. BrokenProcessPool porque el sistema ha matado un proceso de parseo) el error pasa
+    # a la etapa de descarga, y el hilo sigue vaciando la cola para que submit y close no se queden bloqueados
+    def dispatch_loop(self):
+        try:
+            while True:
+                item = self.parse_queue.get()
+                if item is None:
+                    return
+                meta, args, result = item
+                future = Future()
+                if args is None:
+                    future.set_result(result)
+                else:
+                    try:
+                        future = self.executor.submit(parse_content, *args)
+                    except Exception as e:
+                        future.set_exception(e)
+                        if self.error is None:
+                            self.error = e
+                self.write_queue.put((meta, future))
+                self.max_write_queue = max(self.max_write_queue, self.write_queue.qsize())
+        finally:
+            self.write_queue.put(None)
+
+
+    # Etapa de escritura: espera cada resultado en orden y se lo pasa a write_fn
+    def write_loop(self):
+        while True:
+            start = time.perf_counter()
+            item = self.write_queue.get()
+            if item is None:
+                return
+            meta, future = item
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            self.writer_idle += time.perf_counter() - start
+
+            try:
+                self.write_fn(meta, result, error)
+            except Exception as e:
+                # Un fallo al escribir para el pipeline: lo relanzamos en la etapa de descarga
+                self.error = e
+
+
+    # Espera a que se procesen todos los elementos enviados y libera el pool
+    def close(self):
+        # Si el hilo de parseo ya no esta, nadie vaciaria la cola: no se espera a que haya sitio
+        while self.threads[0].is_alive():
+            try:
+                self.parse_queue.put(None, timeout=0.5)
+                break
+            except queue.Full:
+                pass
+        for thread in self.threads:
+            thread.join()
+        self.executor.shutdown()
+        if self.error is not None:
+            raise self.error
+
+
+    def summary(self) -> str:
+        return (f"pipeline: {self.n_items} elementos, {self.parse_workers} parsers, "
+                f"descarga bloqueada {self.submit_blocked:.2f}s, escritura esperando {self.writer_idle:.2f}s, "
+                f"colas max {self.max_parse_queue}/{self.max_write_queue} de {self.queue_size}")
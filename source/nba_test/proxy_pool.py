@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from collections import deque
+
+from rate_limiter import AdaptiveRateLimiter
+from retry_supervisor import RestartError
+
+
+# No queda ningun proxy sano: no se puede seguir
+class NoProxyError(RestartError):
+    pass
+
+
+# Estado de un proxy: sus ultimas respuestas (exito y latencia), cuantos navegadores/sesiones lo usan
+# y su propio limitador de peticiones (cada IP de salida tiene su presupuesto)
+class ProxyStats():
+
+    def __init__(self, url: str, limiter: AdaptiveRateLimiter, window: int = 20):
+        self.url = url
+        self.limiter = limiter
+        self.results = deque(maxlen=window)
+        self.users = 0
+        self.evicted = False
+        self.n_requests = 0
+        self.n_throttled = 0
+
+
+    def success_rate(self) -> float:
+        if len(self.results) == 0:
+            return 1.0
+        return sum(ok for ok, _ in self.results) / len(self.results)
+
+
+    def mean_latency(self) -> float:
+        latencies = [latency for ok, latency in self.results if ok]
+        return sum(latencies) / len(latencies) if len(latencies) > 0 else 0.0
+
+
+    def __str__(self) -> str:
+        state = "expulsado" if self.evicted else f"{self.users} en uso"
+        return (f"{self.url}: {self.n_requests} peticiones, exito={self.success_rate():.0%}, "
+                f"latencia={self.mean_latency():.2f}s, limitadas={self.n_throttled}, {state}")
+
+
+# Pool de proxies (urls tipo http://host:puerto) que se reparten entre los navegadores o sesiones HTTP.
+# acquire() da el proxy sano con menos usuarios (y mejor exito), asi cada worker sale por una IP distinta
+# mientras haya proxies suficientes. Cada proxy tiene su limitador (rate_per_proxy peticiones/s como maximo), que
+# se suma al limitador comun de los scrapers: el ritmo total y el crawl-delay de robots.txt se respetan igual.
+# Un proxy se expulsa si, con al menos min_samples respuestas en la ventana, su tasa de exito baja de
+# min_success, o si el servidor lo limita (429/403) max_throttled veces seguidas.
+class ProxyPool():
+
+    def __init__(self, proxies: list[str], rate_per_proxy: float = 1.0, min_success: float = 0.5, min_samples: int = 5,
+                 max_throttled: int = 3, window: int = 20, slow_latency: float = 10.0, limiter_dir: str = None):
+        assert len(proxies) > 0
+        self.min_success = min_success
+        self.min_samples = min_samples
+        self.max_throttled = max_throttled
+        self.lock = threading.Lock()
+        self.proxies = []
+        for url in proxies:
+            # El estado del limitador de cada proxy se comparte entre procesos igual que el limitador general
+            path = None
+            if limiter_dir is not None:
+                path = os.path.join(limiter_dir, f"rate_limiter-{hashlib.sha1(url.encode()).hexdigest()[:12]}.json")
+            limiter = AdaptiveRateLimiter(max_rate=rate_per_proxy, slow_latency=slow_latency, path=path)
+            self.proxies.append(ProxyStats(url, limiter, window=window))
+        # Limitaciones seguidas de cada proxy
+        self.throttled_streak = {proxy.url: 0 for proxy in self.proxies}
+
+
+    # Lee la lista de proxies de un fichero (uno por linea, se ignoran las lineas vacias y los comentarios #)
+    @staticmethod
+    def read_list(path: str) -> list[str]:
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        return [line for line in lines if line != "" and not line.startswith("#")]
+
+
+    # Asigna un proxy sano a un navegador o sesion (hay que devolverlo con release)
+    def acquire(self) -> ProxyStats:
+        with self.lock:
+            healthy = [proxy for proxy in self.proxies if not proxy.evicted]
+            if len(healthy) == 0:
+                raise NoProxyError("No queda ningun proxy sano")
+            proxy = min(healthy, key=lambda p: (p.users, -p.success_rate(), p.mean_latency()))
+            proxy.users += 1
+            return proxy
+
+
+    def release(self, proxy: ProxyStats):
+        with self.lock:
+            proxy.users = max(0, proxy.users - 1)
+
+
+    # Apunta el resultado de una peticion hecha por el proxy y lo expulsa si ya no esta sano
+    def record(self, proxy: ProxyStats, latency: float, ok: bool, throttled: bool = False):
+        with self.lock:
+            proxy.n_requests += 1
+            proxy.results.append((ok, latency))
+            if throttled:
+                proxy.n_throttled += 1
+                self.throttled_streak[proxy.url] += 1
+            else:
+                self.throttled_streak[proxy.url] = 0
+
+            if proxy.evicted:
+                return
+            unhealthy = len(proxy.results) >= self.min_samples and proxy.success_rate() < self.min_success
+            if unhealthy or self.throttled_streak[proxy.url] >= self.max_throttled:
+                proxy.evicted = True
+                print(f"[WARN] Proxy expulsado del pool: {proxy}")
+
+
+    def summary(self) -> str:
+        healthy = sum(not proxy.evicted for proxy in self.proxies)
+        return f"proxies sanos={healthy} de {len(self.proxies)}\n" + "\n".join(f"  {proxy}" for proxy in self.proxies)
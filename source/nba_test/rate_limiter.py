@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Codigos HTTP con los que el servidor indica que vamos demasiado rapido (o que nos ha bloqueado)
+THROTTLE_STATUS = [403, 429]
+
+
+# Bloqueo exclusivo entre procesos sobre un fichero .lock (se libera al salir del with)
+@contextmanager
+def file_lock(path: str):
+    with open(f"{path}.lock", "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# Limitador de peticiones global (token bucket) con ajuste AIMD del ritmo:
+# - cada respuesta rapida suma `increase` peticiones/s al ritmo, hasta max_rate
+# - una respuesta lenta (mas de slow_latency segundos) lo multiplica por slow_decrease
+# - un 429/403 o una pagina de bloqueo lo multiplica por decrease y vacia el bucket
+# El crawl-delay de robots.txt es un suelo para el intervalo entre peticiones (un techo para el ritmo).
+# El estado (ritmo, tokens) se comparte entre hilos con un lock y, si se indica path, entre procesos con un
+# fichero json bloqueado, asi todos los workers respetan el mismo ritmo. Un estado de hace mas de ttl
+# segundos se descarta y se vuelve a empezar con start_rate.
+class AdaptiveRateLimiter():
+
+    def __init__(self, max_rate: float = 1.0, min_rate: float = 0.05, start_rate: float = None, burst: float = 1.0,
+                 increase: float = 0.05, decrease: float = 0.5, slow_decrease: float = 0.8, slow_latency: float = 5.0,
+                 path: str = None, ttl: float = 600):
+        assert 0 < min_rate <= max_rate and burst >= 1
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.start_rate = max_rate / 2 if start_rate is None else start_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_decrease = slow_decrease
+        self.slow_latency = slow_latency
+        self.path = path
+        self.ttl = ttl
+
+        self.lock = threading.Lock()
+        self.state = self.initial_state()
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory != "":
+                os.makedirs(directory, exist_ok=True)
+
+        # Estadisticas de este proceso
+        self.n_requests = 0
+        self.waited = 0.0
+        self.n_slow = 0
+        self.n_throttled = 0
+
+
+    def initial_state(self) -> dict:
+        # min_interval: crawl-delay de robots.txt
+        return {"rate": self.start_rate, "tokens": self.burst, "updated": time.time(), "min_interval": 0.0}
+
+
+    # Ritmo maximo permitido: max_rate, y nunca mas rapido que el crawl-delay
+    def ceiling(self, state: dict) -> float:
+        if state["min_interval"] > 0:
+            return min(self.max_rate, 1.0 / state["min_interval"])
+        return self.max_rate
+
+
+    def load(self) -> dict:
+        if self.path is None:
+            return self.state
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return self.initial_state()
+        if time.time() - state["updated"] > self.ttl:
+            return self.initial_state()
+        return state
+
+
+    def save(self, state: dict):
+        self.state = state
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+
+    # Aplica fn(state, now) al estado compartido (leido, modificado y guardado con el lock cogido)
+    def update(self, fn):
+        with self.lock:
+            if self.path is None:
+                return fn(self.state, time.time())
+            with file_lock(self.path):
+                state = self.load()
+                result = fn(state, time.time())
+                self.save(state)
+                return result
+
+
+    # Intervalo minimo entre peticiones (crawl-delay de robots.txt)
+    def set_min_interval(self, interval: float):
+        def apply(state, now):
+            state["min_interval"] = interval
+            state["rate"] = min(state["rate"], self.ceiling(state))
+        self.update(apply)
+
+
+    # Reserva un token y espera lo necesario hasta poder hacer la peticion. Devuelve los segundos esperados
+    def acquire(self) -> float:
+        def take(state, now):
+            state["tokens"] = min(self.burst, state["tokens"] + (now - state["updated"]) * state["rate"])
+            state["updated"] = now
+            # Si no hay token se queda en negativo: la reserva de esta peticion
+            state["tokens"] -= 1
+            delay = 0.0 if state["tokens"] >= 0 else -state["tokens"] / state["rate"]
+            self.n_requests += 1
+            self.waited += delay
+            return delay
+
+        delay = self.update(take)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+    # Ajusta el ritmo segun la respuesta: latencia en segundos, si el servidor nos ha frenado y si ha fallado
+    # por otro motivo (timeout, tabla vacia...), que se trata como una respuesta lenta
+    def record(self, latency: float, throttled: bool = False, failed: bool = False):
+        slow = failed or latency > self.slow_latency
+
+        def adjust(state, now):
+            if throttled:
+                state["rate"] = max(self.min_rate, state["rate"] * self.decrease)
+                # Ninguna peticion mas hasta que se recargue un token al nuevo ritmo
+                state["tokens"] = min(state["tokens"], 0.0)
+            elif slow:
+                state["rate"] = max(self.min_rate, state["rate"] * self.slow_decrease)
+            else:
+                state["rate"] = state["rate"] + self.increase
+            state["rate"] = min(state["rate"], self.ceiling(state))
+            return state["rate"]
+
+        rate = self.update(adjust)
+        if throttled:
+            self.n_throttled += 1
+            print(f"[WARN] El servidor esta limitando las peticiones, bajamos a {rate:.2f} peticiones/s")
+        elif slow:
+            self.n_slow += 1
+
+
+    def rate(self) -> float:
+        return self.update(lambda state, now: state["rate"])
+
+
+    def summary(self) -> str:
+        return (f"ritmo={self.rate():.2f} peticiones/s peticiones={self.n_requests} esperando={self.waited:.1f}s "
+                f"lentas={self.n_slow} limitadas={self.n_throttled}")
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+import pandas as pd
+
+
+# Acumulador de los DataFrames parciales de cada combinacion de filtros.
+# append() solo guarda una referencia al chunk (O(1)) y el DataFrame final se construye
+# con un unico pd.concat en to_dataframe(), en vez de copiar el acumulado en cada combinacion.
+# Si se indica max_bytes, los chunks terminados se vuelcan a disco (pickle, conserva los dtypes)
+# cuando la memoria retenida supera ese limite.
+class ResultCollector():
+
+    def __init__(self, max_bytes: int = None, spill_dir: str = None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+
+        self.chunks = []
+        self.spilled_files = []
+
+        # Contadores para ver el perfil de memoria de la ejecucion
+        self.n_rows = 0
+        self.n_chunks = 0
+        self.nbytes = 0
+        self.spilled_rows = 0
+        self.spilled_bytes = 0
+
+
+    def append(self, df: pd.DataFrame):
+        if df is None or len(df) == 0:
+            return
+
+        self.chunks.append(df)
+        self.n_rows += len(df)
+        self.n_chunks += 1
+        self.nbytes += int(df.memory_usage(index=True, deep=True).sum())
+
+        if self.max_bytes is not None and self.nbytes > self.max_bytes:
+            self.spill()
+
+
+    # Vuelca a disco todos los chunks retenidos en memoria
+    def spill(self):
+        if len(self.chunks) == 0:
+            return
+
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="nba_collector_")
+        os.makedirs(self.spill_dir, exist_ok=True)
+
+        path = os.path.join(self.spill_dir, f"chunk_{len(self.spilled_files):05d}.pkl")
+        chunk = pd.concat(self.chunks)
+        chunk.to_pickle(path)
+
+        self.spilled_files.append(path)
+        self.spilled_rows += len(chunk)
+        self.spilled_bytes += os.path.getsize(path)
+
+        self.chunks = []
+        self.nbytes = 0
+
+
+    # Materializa el resultado completo (chunks volcados + chunks en memoria)
+    def to_dataframe(self) -> pd.DataFrame:
+        frames = [pd.read_pickle(path) for path in self.spilled_files] + self.chunks
+        if len(frames) == 0:
+            return None
+
+        df = pd.concat(frames)
+
+        # pd.concat convierte a object las categoricas cuyas categorias difieren entre chunks, las restauramos
+        categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+        if len(categorical) > 0:
+            df = df.astype({c: "category" for c in categorical})
+
+        return df
+
+
+    def memory_profile(self) -> str:
+        return (f"filas={self.n_rows} chunks={self.n_chunks} "
+                f"memoria={self.nbytes / 1024:.1f} KiB "
+                f"disco={self.spilled_rows} filas / {self.spilled_bytes / 1024:.1f} KiB")
+
+
+    # Elimina los ficheros volcados a disco
+    def cleanup(self):
+        for path in self.spilled_files:
+            if os.path.exists(path):
+                os.remove(path)
+        self.spilled_files = []
@@ -0,0 +1,77 @@
+import random
+import time
+
+
+# No se pudo recrear el navegador: no tiene sentido seguir reintentando
+class RestartError(Exception):
+    pass
+
+
+# Reintenta cada combinacion de filtros como una unidad independiente.
+# Entre intentos espera un backoff exponencial con jitter (base_delay * 2^(intento-1), como maximo max_delay,
+# y un valor aleatorio entre la mitad y el total para que los workers no reintenten a la vez).
+# Tras restart_after fallos seguidos (contando los de combinaciones anteriores) llama a restart() para
+# recrear el navegador antes del siguiente intento. Si se agotan los intentos se relanza el ultimo error
+# y si falla el reinicio se lanza RestartError.
+class RetrySupervisor():
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 30.0, restart_after: int = 2,
+                 retry_on: tuple = (Exception,)):
+        assert max_attempts >= 1 and restart_after >= 1
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.restart_after = restart_after
+        self.retry_on = retry_on
+
+        # Fallos seguidos desde el ultimo exito o reinicio del navegador
+        self.consecutive_failures = 0
+
+        self.retries = 0
+        self.restarts = 0
+        self.recovered = 0
+        self.given_up = 0
+
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(delay / 2, delay)
+
+
+    # Ejecuta fn() hasta que funcione o se agoten los intentos.
+    # restart(): recrea el navegador (None si el backend no tiene nada que reiniciar)
+    def run(self, fn, label: str = "", restart=None):
+        attempt = 1
+        while True:
+            try:
+                result = fn()
+            except self.retry_on as e:
+                self.consecutive_failures += 1
+                if attempt >= self.max_attempts:
+                    self.given_up += 1
+                    raise
+                delay = self.backoff(attempt)
+                print(f"[WARN] {label}: intento {attempt} de {self.max_attempts} fallido ({e}), reintentando en {delay:.1f} segundos")
+                time.sleep(delay)
+
+                if restart is not None and self.consecutive_failures >= self.restart_after:
+                    print(f"[WARN] {self.consecutive_failures} fallos seguidos, reiniciando el navegador")
+                    try:
+                        restart()
+                    except Exception as restart_error:
+                        raise RestartError(f"No se pudo reiniciar el navegador: {restart_error}") from restart_error
+                    self.restarts += 1
+                    self.consecutive_failures = 0
+                self.retries += 1
+                attempt += 1
+                continue
+
+            self.consecutive_failures = 0
+            if attempt > 1:
+                self.recovered += 1
+            return result
+
+
+    def summary(self) -> str:
+        return (f"reintentos={self.retries} recuperadas={self.recovered} abandonadas={self.given_up} "
+                f"reinicios del navegador={self.restarts}")
@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from urllib import robotparser
+from urllib.parse import urlparse
+
+import requests
+
+
+# Cache de politicas robots.txt por host.
+# Cada robots.txt se descarga una sola vez y se reutiliza durante ttl segundos, tanto entre
+# endpoints como entre workers (la cache es thread-safe y se puede compartir). El contenido
+# se guarda en disco (json) para no volver a descargarlo en la siguiente ejecucion.
+# Un error 5xx es temporal: mientras dura se prohibe todo, pero solo se guarda en memoria y
+# se vuelve a pedir pasados error_ttl segundos.
+class RobotsCache():
+
+    def __init__(self, user_agent: str, ttl: float = 24 * 3600, path: str = None, timeout: float = 10, error_ttl: float = 300):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.path = path
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        # host -> {"fetched_at": ..., "status": ..., "lines": [...]}
+        self.entries = {}
+        # host -> RobotFileParser ya parseado
+        self.parsers = {}
+
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+
+    # Descarga robots.txt de un host. Igual que RobotFileParser.read(): 401/403 -> todo prohibido, otro 4xx -> todo permitido
+    # y 5xx -> no se parsea nada, asi que can_fetch devuelve False para todo
+    def download(self, host: str) -> dict:
+        response = requests.get(f"{host}/robots.txt", headers={"User-Agent": self.user_agent}, timeout=self.timeout)
+        lines = response.text.splitlines() if response.status_code < 400 else []
+        return {"fetched_at": time.time(), "status": response.status_code, "lines": lines}
+
+
+    def build_parser(self, entry: dict) -> robotparser.RobotFileParser:
+        rp = robotparser.RobotFileParser()
+        if entry["status"] in (401, 403) or entry["status"] >= 500:
+            rp.disallow_all = True
+        elif entry["status"] >= 400:
+            rp.allow_all = True
+        else:
+            rp.parse(entry["lines"])
+        return rp
+
+
+    # Devuelve el parser de robots.txt del host de url, descargandolo solo si no esta en cache o ha caducado
+    def get(self, url: str) -> robotparser.RobotFileParser:
+        host = self.host_of(url)
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry is None or time.time() - entry["fetched_at"] > self.entry_ttl(entry):
+                entry = self.download(host)
+                self.entries[host] = entry
+                self.parsers.pop(host, None)
+                self.save()
+            if host not in self.parsers:
+                self.parsers[host] = self.build_parser(entry)
+            return self.parsers[host]
+
+
+    # Segundos durante los que vale una entrada (poco si el servidor ha fallado)
+    def entry_ttl(self, entry: dict) -> float:
+        return self.error_ttl if entry["status"] >= 500 else self.ttl
+
+
+    def save(self):
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory != "":
+            os.makedirs(directory, exist_ok=True)
+        # Escritura atomica para no dejar el fichero a medias si varios procesos lo comparten
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # Los errores 5xx no se guardan: la siguiente ejecucion vuelve a pedir robots.txt
+            json.dump({host: entry for host, entry in self.entries.items() if entry["status"] < 500}, f)
+        os.replace(tmp_path, self.path)
+
+
+    def can_fetch(self, url: str) -> bool:
+        return self.get(url).can_fetch(useragent=self.user_agent, url=url)
+
+
+    # Crawl-delay (segundos) para nuestro user agent, o None si robots.txt no lo indica
+    def crawl_delay(self, url: str) -> float:
+        delay = self.get(url).crawl_delay(self.user_agent)
+        return None if delay is None else float(delay)
+
+
+    # Request-rate como (peticiones, segundos), o None si robots.txt no lo indica
+    def request_rate(self, url: str) -> tuple[int, int]:
+        rate = self.get(url).request_rate(self.user_agent)
+        return None if rate is None else (rate.requests, rate.seconds)
+
+
+    # Intervalo minimo entre peticiones (segundos) segun crawl-delay y request-rate
+    def min_interval(self, url: str) -> float:
+        interval = 0.0
+        delay = self.crawl_delay(url)
+        if delay is not None:
+            interval = max(interval, delay)
+        rate = self.request_rate(url)
+        if rate is not None and rate[0] > 0:
+            interval = max(interval, rate[1] / rate[0])
+        return interval
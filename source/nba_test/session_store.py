@@ -0,0 +1,89 @@
+import json
+import os
+import threading
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+# Campos de las cookies que acepta Network.setCookies
+COOKIE_FIELDS = ["name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires"]
+
+
+# Estado del navegador que se reutiliza entre ejecuciones y entre workers:
+# - un directorio de perfil de Chrome (user-data-dir) por worker, porque Chrome no permite que dos
+#   navegadores abiertos compartan el mismo perfil
+# - un bote de cookies comun (cookies.json) con las cookies de nba.com, incluida la del consentimiento de
+#   cookies, que se carga en cada navegador nuevo y se actualiza al cerrarlo
+class SessionStore():
+
+    def __init__(self, path: str, domains: list[str] = ["nba.com", "cookielaw.org", "onetrust.com"]):
+        self.path = path
+        self.cookies_path = os.path.join(path, "cookies.json")
+        self.domains = domains
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(path, "profiles"), exist_ok=True)
+
+
+    # Directorio de perfil de Chrome de un worker (ruta absoluta, como la pide --user-data-dir).
+    # generation > 0 da un perfil distinto, para cuando el navegador anterior del worker sigue bloqueando el suyo
+    def profile_dir(self, worker_id: int, generation: int = 0) -> str:
+        name = f"worker-{worker_id}" if generation == 0 else f"worker-{worker_id}-{generation}"
+        return os.path.abspath(os.path.join(self.path, "profiles", name))
+
+
+    # Cookies guardadas que no han caducado
+    def load_cookies(self) -> list[dict]:
+        with self.lock:
+            return self.read_cookies()
+
+
+    def read_cookies(self) -> list[dict]:
+        if not os.path.exists(self.cookies_path):
+            return []
+        with open(self.cookies_path, encoding="utf-8") as f:
+            cookies = json.load(f)
+        now = time.time()
+        return [c for c in cookies if c.get("expires", -1) <= 0 or c["expires"] > now]
+
+
+    # Añade (o sustituye) cookies en el bote comun
+    def save_cookies(self, cookies: list[dict]):
+        # Las cookies de sesion (expires <= 0) se guardan sin caducidad
+        cookies = [{k: c[k] for k in COOKIE_FIELDS if k in c and not (k == "expires" and c[k] <= 0)} for c in cookies
+                   if any(c.get("domain", "").endswith(d) for d in self.domains)]
+        if len(cookies) == 0:
+            return
+
+        with self.lock:
+            current = {(c["name"], c["domain"], c.get("path", "/")): c for c in self.read_cookies()}
+            for c in cookies:
+                current[(c["name"], c["domain"], c.get("path", "/"))] = c
+
+            tmp_path = f"{self.cookies_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(current.values()), f, indent=1)
+            os.replace(tmp_path, self.cookies_path)
+
+
+    # Carga las cookies guardadas en el navegador (sin tener que abrir antes el dominio)
+    def restore(self, driver) -> int:
+        cookies = self.load_cookies()
+        if len(cookies) == 0:
+            return 0
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except WebDriverException as e:
+            print(f"[WARN] No se pudieron cargar las cookies guardadas: {e}")
+            return 0
+        return len(cookies)
+
+
+    # Guarda las cookies actuales del navegador en el bote comun
+    def capture(self, driver):
+        try:
+            cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+        except WebDriverException as e:
+            print(f"[WARN] No se pudieron leer las cookies del navegador: {e}")
+            return
+        self.save_cookies(cookies)
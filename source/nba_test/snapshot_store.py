@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+# Almacen local de las paginas/respuestas descargadas, direccionado por contenido.
+# Cada contenido se guarda comprimido (gzip) una sola vez bajo su sha256, y un indice (index.json)
+# relaciona cada (endpoint, temporada, conferencia, posicion) con el hash de su contenido.
+# Permite volver a parsear todo el dataset sin navegador ni red (modo replay).
+class SnapshotStore():
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = os.path.join(path, "index.json")
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.join(path, "objects"), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+
+
+    @staticmethod
+    def key_of(sub_url: str, season: str, conference: str, position: str) -> str:
+        return "|".join([sub_url, season, conference, position])
+
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.path, "objects", digest[:2], f"{digest}.gz")
+
+
+    # Guarda el contenido (html, json o tabla) de una combinacion y devuelve su hash.
+    # kind="empty" (sin contenido) apunta que la pagina del endpoint no ofrece la combinacion
+    def put(self, sub_url: str, season: str, conference: str, position: str, content: str, kind: str = "html") -> str:
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+
+        # Si el contenido ya existe no se vuelve a escribir
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        with self.lock:
+            self.index[self.key_of(sub_url, season, conference, position)] = {
+                "sha256": digest,
+                "kind": kind,
+                "size": len(data),
+                "fetched_at": time.time(),
+            }
+            self.save_index()
+
+        return digest
+
+
+    def save_index(self):
+        tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+
+    # Devuelve (contenido, tipo) de una combinacion, o None si no esta guardada
+    def get(self, sub_url: str, season: str, conference: str, position: str) -> tuple[str, str]:
+        entry = self.index.get(self.key_of(sub_url, season, conference, position))
+        if entry is None:
+            return None
+        with gzip.open(self.object_path(entry["sha256"]), "rb") as f:
+            return f.read().decode("utf-8"), entry["kind"]
+
+
+    # Tipo del contenido guardado de una combinacion ("empty" si la pagina no la ofrecia), o None si no esta guardada
+    def kind(self, sub_url: str, season: str, conference: str, position: str) -> str:
+        entry = self.index.get(self.key_of(sub_url, season, conference, position))
+        return None if entry is None else entry["kind"]
+
+
+    # Combinaciones guardadas de un endpoint, en el orden en que se descargaron
+    def combinations(self, sub_url: str) -> list[tuple[str, str, str]]:
+        result = []
+        for key in self.index:
+            parts = key.split("|")
+            if parts[0] == sub_url:
+                result.append(tuple(parts[1:]))
+        return result
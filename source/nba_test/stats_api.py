@@ -0,0 +1,166 @@
+import datetime
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from table_builder import TableBuilder
+
+
+# API JSON que usan las paginas de nba.com/stats para rellenar sus tablas
+STATS_API_URL = "https://stats.nba.com/stats/"
+
+# Rangos de tiro que muestra la tabla de /teams/shooting (y que tiene el dataset)
+SHOT_RANGES = ["less than 5 ft.", "5-9 ft.", "10-14 ft.", "15-19 ft.", "20-24 ft.", "25-29 ft."]
+
+# Endpoint de la API (y parametros propios) equivalente a cada pagina de estadisticas.
+# categories son las columnas que devuelve la tabla html cuando no se piden categorias de interes
+ENDPOINTS = {
+    "/teams/shooting": {
+        "endpoint": "leaguedashteamshotlocations",
+        "params": {"DistanceRange": "5ft Range", "MeasureType": "Base"},
+        "categories": [f"{r} {s}" for r in SHOT_RANGES for s in ["fgm", "fga", "fg pct"]],
+    },
+    "/teams/hustle": {
+        "endpoint": "leaguehustlestatsteam",
+        "params": {},
+        "categories": [],
+    },
+    "/teams/box-outs": {
+        "endpoint": "leaguehustlestatsteam",
+        "params": {},
+        "categories": [],
+    },
+}
+
+# Valores del filtro de posicion en la api (en la web se muestran con el nombre completo),
+# en el mismo orden que el desplegable de la web
+POSITIONS = {"Forward": "F", "Center": "C", "Guard": "G"}
+CONFERENCES = ["East", "West"]
+
+# Parametros comunes a todos los endpoints leaguedash*/leaguehustle*
+DEFAULT_PARAMS = {
+    "LeagueID": "00",
+    "PerMode": "PerGame",
+    "SeasonType": "Regular Season",
+    "DateFrom": "", "DateTo": "", "GameScope": "", "GameSegment": "", "LastNGames": "0",
+    "Location": "", "Month": "0", "OpponentTeamID": "0", "Outcome": "", "PORound": "0",
+    "PaceAdjust": "N", "Period": "0", "PlayerExperience": "", "PlusMinus": "N", "Rank": "N",
+    "SeasonSegment": "", "ShotClockRange": "", "StarterBench": "", "TeamID": "0",
+    "VsConference": "", "VsDivision": "", "Division": "",
+}
+
+# Cabeceras que envia el navegador desde nba.com, sin ellas la api no responde
+DEFAULT_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Origin": "https://www.nba.com",
+    "Referer": "https://www.nba.com/",
+    "x-nba-stats-origin": "stats",
+    "x-nba-stats-token": "true",
+}
+
+
+# Peticion a la api (endpoint y parametros propios) de una pagina. Paginas con la misma peticion
+# (hustle y box-outs salen de leaguehustlestatsteam) pueden compartir la respuesta de cada combinacion
+def api_request(sub_url: str) -> tuple:
+    endpoint = ENDPOINTS[sub_url]
+    return endpoint["endpoint"], tuple(sorted(endpoint["params"].items()))
+
+
+# Lista de temporadas en formato "2024-25", de la mas reciente a la mas antigua (mismo orden que el desplegable)
+def season_list(first_year: int = 1996, today: datetime.date = None) -> list[str]:
+    today = datetime.date.today() if today is None else today
+    # La temporada empieza en octubre
+    last_year = today.year if today.month >= 10 else today.year - 1
+    return [f"{y}-{str(y + 1)[-2:]}" for y in range(last_year, first_year - 1, -1)]
+
+
+# Convierte la respuesta JSON de la api en el mismo DataFrame que get_table_contents
+def table_from_json(data: dict, season: str, conference: str, position: str, cats_of_interest: list[str] = []) -> pd.DataFrame:
+    result_set = data["resultSets"]
+    # Algunos endpoints devuelven una lista de resultSets y otros (shot locations) uno solo
+    if isinstance(result_set, list):
+        result_set = result_set[0]
+
+    headers = result_set["headers"]
+    rows = result_set["rowSet"]
+
+    if len(headers) > 0 and isinstance(headers[0], dict):
+        # Cabecera de dos niveles: rango de tiro + (FGM, FGA, FG_PCT)
+        shot_categories = headers[0]["columnNames"]
+        skip = headers[0].get("columnsToSkip", 0)
+        span = headers[0].get("columnSpan", 1)
+        columns = headers[1]["columnNames"]
+        fields = [c.lower() for c in columns[:skip]]
+        for i, shot_cat in enumerate(shot_categories):
+            for stat in columns[skip + i * span: skip + (i + 1) * span]:
+                fields.append(f"{shot_cat} {stat.replace('_', ' ')}".lower())
+    else:
+        fields = [h.lower() for h in headers]
+
+    name_idx = fields.index("team_name")
+    if len(cats_of_interest) == 0:
+        cats_of_interest = [f for f in fields if f not in ("team_id", "team_name", "team_abbreviation")]
+    categories_idx = [fields.index(c) for c in cats_of_interest]
+    # La web muestra los porcentajes sobre 100, la api como fraccion
+    scales = [100.0 if c.endswith("pct") else 1.0 for c in cats_of_interest]
+
+    builder = TableBuilder(season=season, conference=conference, position=position, categories=cats_of_interest, n_rows=len(rows))
+    for row in rows:
+        team_stats = [float("nan") if row[i] is None else float(row[i]) * scale for i, scale in zip(categories_idx, scales)]
+        builder.add_row(team_name=row[name_idx], team_stats=team_stats)
+
+    return builder.to_dataframe()
+
+
+# table_from_json con las categorias por defecto del endpoint (las mismas columnas que la tabla html)
+def endpoint_table_from_json(data: dict, sub_url: str, season: str, conference: str, position: str, cats_of_interest: list[str] = []) -> pd.DataFrame:
+    if len(cats_of_interest) == 0:
+        cats_of_interest = ENDPOINTS[sub_url]["categories"]
+    return table_from_json(data, season=season, conference=conference, position=position, cats_of_interest=cats_of_interest)
+
+
+# Cliente HTTP para la api de estadisticas, con pool de conexiones y reintentos
+class StatsApiClient():
+
+    # proxy: url del proxy por el que salen las peticiones (None = conexion directa)
+    def __init__(self, user_agent: str, api_url: str = STATS_API_URL, timeout: float = 30, pool_size: int = 4, proxy: str = None):
+        self.api_url = api_url if api_url.endswith("/") else api_url + "/"
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.headers["User-Agent"] = user_agent
+
+        retries = Retry(total=3, backoff_factor=1.0, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.set_proxy(proxy)
+
+
+    def set_proxy(self, proxy: str = None):
+        self.session.proxies = {} if proxy is None else {"http": proxy, "https": proxy}
+
+
+    def endpoint_url(self, sub_url: str) -> str:
+        return f"{self.api_url}{ENDPOINTS[sub_url]['endpoint']}"
+
+
+    # Descarga el JSON (como texto) de un endpoint para una combinacion de filtros
+    def fetch_raw(self, sub_url: str, season: str, conference: str, position: str) -> str:
+        params = dict(DEFAULT_PARAMS)
+        params.update(ENDPOINTS[sub_url]["params"])
+        params["Season"] = season
+        params["Conference"] = conference
+        params["PlayerPosition"] = POSITIONS.get(position, position)
+
+        response = self.session.get(self.endpoint_url(sub_url), params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+
+    def close(self):
+        self.session.close()
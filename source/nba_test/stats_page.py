@@ -0,0 +1,459 @@
+import time
+from urllib.parse import urlencode
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from waits import TableRefreshWait
+from stats_api import CONFERENCES, POSITIONS, season_list
+
+
+# Desplegables de filtros de la pagina (cada uno con su etiqueta <p> y su <select>)
+FILTER_SELECTOR = ".nba-stats-primary-split-block .DropDown_label__lttfI"
+
+# Etiqueta y opciones (value y texto) de todos los desplegables de filtros, en una sola llamada
+FILTER_OPTIONS_JS = """
+const out = [];
+for (const label of document.querySelectorAll(arguments[0])) {
+    const p = label.querySelector('p');
+    const select = label.querySelector('select');
+    if (!p || !select) { continue; }
+    out.push({
+        label: p.innerText.trim().toUpperCase(),
+        options: Array.from(select.options).map(o => ({value: o.value, text: o.text.trim()})),
+    });
+}
+return out;
+"""
+
+# Selecciona por value la opcion del desplegable con la etiqueta arguments[1]. Se usa el setter nativo y se lanza
+# el evento change para que React actualice su estado. Devuelve true si el desplegable queda con ese valor
+SELECT_OPTION_JS = """
+for (const label of document.querySelectorAll(arguments[0])) {
+    const p = label.querySelector('p');
+    const select = label.querySelector('select');
+    if (!p || !select || p.innerText.trim().toUpperCase() !== arguments[1]) { continue; }
+    const setter = Object.getOwnPropertyDescriptor(HTMLSelectElement.prototype, 'value').set;
+    setter.call(select, arguments[2]);
+    select.dispatchEvent(new Event('change', {bubbles: true}));
+    return select.value === arguments[2];
+}
+return false;
+"""
+
+# Busca el boton con el texto arguments[1] (en minusculas) y lo pulsa si arguments[2]. Devuelve si existe
+BUTTON_JS = """
+for (const button of document.querySelectorAll(arguments[0])) {
+    if (button.innerText.trim().toLowerCase() === arguments[1]) {
+        if (arguments[2]) { button.click(); }
+        return true;
+    }
+}
+return false;
+"""
+
+# Titulo y principio del texto de la pagina, para reconocer las paginas de bloqueo (p.ej. "Access Denied" de Akamai)
+PAGE_TEXT_JS = "return document.title + ' ' + (document.body ? document.body.innerText.slice(0, 500) : '');"
+BLOCKED_MARKERS = ["access denied", "too many requests", "rate limit"]
+
+# Texto de la opcion seleccionada en cada desplegable de filtros, por etiqueta (SEASON, CONFERENCE, ...)
+SELECTED_FILTERS_JS = """
+const out = {};
+for (const label of document.querySelectorAll(arguments[0])) {
+    const p = label.querySelector('p');
+    const select = label.querySelector('select');
+    if (p && select && select.selectedIndex >= 0) {
+        out[p.innerText.trim().toUpperCase()] = select.options[select.selectedIndex].text.trim();
+    }
+}
+return out;
+"""
+
+
+# Extrae en el navegador la cabecera (atributos field) y todas las celdas de la tabla arguments[0], y las
+# devuelve serializadas como JSON. Asi no hace falta traer todo el page_source por el protocolo de WebDriver.
+# Las columnas de interes se eligen despues en Python, asi el snapshot sirve para columnas nuevas.
+# Devuelve null si no hay tabla.
+TABLE_JS = """
+const table = document.querySelector(arguments[0]);
+if (!table) { return null; }
+const fields = Array.from(table.querySelectorAll('thead tr.Crom_headers__mzI_m th'))
+    .slice(1).map(th => (th.getAttribute('field') || '').toLowerCase());
+const rows = Array.from(table.querySelectorAll('tbody tr')).map(
+    tr => Array.from(tr.querySelectorAll('td')).map(td => td.textContent.trim()));
+return JSON.stringify({fields: fields, rows: rows});
+"""
+
+
+# Estado del consentimiento de cookies (OneTrust): "accepted" si ya se acepto (cookie OptanonAlertBoxClosed),
+# "banner" si se muestra el boton de aceptar, o null si todavia no se sabe
+CONSENT_JS = """
+if (document.cookie.indexOf('OptanonAlertBoxClosed=') >= 0) { return 'accepted'; }
+const button = document.getElementById('onetrust-accept-btn-handler');
+if (button && button.offsetParent !== null) { return 'banner'; }
+return null;
+"""
+
+
+# Indica si la pestaña ya muestra la tabla de la pagina nueva: el documento anterior (marcado antes de navegar)
+# ya no esta, la tabla existe y no hay indicadores de carga visibles
+READY_JS = """
+if (window.__staleStatsPage) { return false; }
+if (!document.querySelector(arguments[0])) { return false; }
+for (const el of document.querySelectorAll(arguments[1])) {
+    if (el.offsetParent !== null) { return false; }
+}
+return true;
+"""
+
+
+# Error al interactuar con una pagina de estadisticas (el navegador ya no es fiable)
+class PageError(Exception):
+    pass
+
+
+# La pagina no muestra la tabla de los filtros pedidos (solo falla esa combinacion, que se puede reintentar)
+class FilterMismatchError(ValueError):
+    pass
+
+
+# Una pagina de nba.com/stats abierta en una pestaña del navegador.
+# navigation="clicks": se despliega el panel de filtros avanzados y cada combinacion se aplica pulsando
+# los desplegables (solo los que cambian) y "Get Stats".
+# navigation="url": cada combinacion se carga directamente con los filtros como parametros de la url
+# (Season, Conference, PlayerPosition) y se comprueba que los tres filtros mostrados coinciden (conferencia
+# y posicion solo se ven con el panel avanzado abierto, asi que se abre tras cada carga si no lo esta).
+class StatsPage():
+
+    def __init__(self, driver, url: str, refresh_wait: TableRefreshWait, timeout: float = 20, navigation: str = "clicks"):
+        assert navigation in ["clicks", "url"]
+        self.driver = driver
+        self.url = url
+        self.refresh_wait = refresh_wait
+        self.table_selector = "table.Crom_table__p1iZz"
+        self.wait = WebDriverWait(self.driver, timeout)
+        self.navigation = navigation
+
+        self.handle = None
+        self.button_selector = "button.Button_button__L2wUb"
+        self.season_options = {}
+        self.conference_options = {}
+        self.position_options = {}
+        self.selected = (None, None, None)
+        # Carga no bloqueante en curso (ver start/ready/finish)
+        self.pending = None
+        self.table_before = None
+        self.seen_loading = False
+
+
+    # Detecta si hay que aceptar las cookies: espera hasta que se vea el banner o la cookie de consentimiento.
+    # Si no aparece ninguno de los dos en consent_timeout segundos se asume que no hace falta
+    def consent_needed(self, consent_timeout: float = 10, poll: float = 0.2) -> bool:
+        start = time.monotonic()
+        while time.monotonic() - start < consent_timeout:
+            try:
+                state = self.driver.execute_script(CONSENT_JS)
+            except WebDriverException:
+                state = None
+            if state is not None:
+                return state == "banner"
+            time.sleep(poll)
+        print("[WARN] No se detecto el banner de cookies, se continua sin aceptarlas")
+        return False
+
+
+    # Carga la pagina en la pestaña actual, acepta las cookies si hace falta y despliega los filtros.
+    # check_accept_cookies=None detecta automaticamente si hace falta aceptarlas.
+    # Devuelve True si se han aceptado las cookies
+    def open(self, check_accept_cookies: bool = None) -> bool:
+        self.handle = self.driver.current_window_handle
+        self.driver.get(self.url)
+        accepted = False
+
+        if check_accept_cookies is None:
+            check_accept_cookies = self.consent_needed()
+
+        # No aparecerá el boton de aceptar cookies si ya se ha aceptado en el link anterior
+        if check_accept_cookies:
+            try:
+                # https://stackoverflow.com/questions/64032271/handling-accept-cookies-popup-with-selenium-in-python
+                print("Waiting...")
+                self.wait.until(
+                    EC.element_to_be_clickable((By.ID, "onetrust-accept-btn-handler"))
+                ).click()
+                accepted = True
+                print("Cookies accepted!")
+            except WebDriverException:
+                raise PageError("Wait failed!")
+
+        # Esperamos a que desaparezca el banner de cookies, para que no se solape con empezar la extraccion de las tablas, o el programa peta
+        try:
+            self.wait.until(EC.invisibility_of_element_located((By.ID, "onetrust-banner-sdk")))
+        except WebDriverException:
+            raise PageError("Wait failed!")
+
+        # Navegando por url no hacen falta ni el panel de filtros ni el boton, solo las temporadas disponibles
+        if self.navigation == "url":
+            self.read_options()
+            self.season_options = self.season_options or {s: s for s in season_list()}
+            self.conference_options = self.conference_options or {c: c for c in CONFERENCES}
+            self.position_options = self.position_options or dict(POSITIONS)
+            return accepted
+
+        # Cargamos los filtros avanzados para poder hacer búsqueda por conferencias
+        print("Intentando abrir Advanced Filters...")
+        self.open_advanced_filters()
+        print("Advanced Filters abiertos.")
+
+        # Nos aseguramos de tener boton para aplicar los filtros (se busca de nuevo cada vez que se pulsa,
+        # porque la tabla se vuelve a renderizar tras cada "Get Stats")
+        try:
+            found = self.driver.execute_script(BUTTON_JS, self.button_selector, "get stats", False)
+        except WebDriverException:
+            raise PageError("No se pudo acceder a los botones.")
+        if not found:
+            raise PageError("No se encontro el boton Get Stats.")
+
+        self.read_options()
+        return accepted
+
+
+    # Despliega el panel de filtros avanzados (conferencia y posicion) y espera a que aparezcan sus desplegables
+    def open_advanced_filters(self):
+        try:
+            toggle_button = self.wait.until(EC.element_to_be_clickable(
+                (By.CSS_SELECTOR, "button.StatsAdvancedFiltersPanel_safArrow__EqRgu")
+            ))
+            toggle_button.click()
+            # Esperamos a que se desplieguen los filtros de conferencia y posicion
+            self.refresh_wait.wait_for_filters(["SEASON", "CONFERENCE", "POSITION"])
+        except WebDriverException as e:
+            raise PageError(f"No se pudo abrir el panel de filtros avanzados.\n{e}")
+
+
+    # Texto de los filtros que muestra la pagina (SEASON, CONFERENCE, POSITION). Si el panel avanzado esta
+    # cerrado (cada carga por url es un documento nuevo) se abre para poder leer conferencia y posicion
+    def shown_filters(self) -> dict:
+        try:
+            shown = self.driver.execute_script(SELECTED_FILTERS_JS, FILTER_SELECTOR)
+            if "CONFERENCE" in shown and "POSITION" in shown:
+                return shown
+        except WebDriverException as e:
+            raise PageError(str(e))
+        self.open_advanced_filters()
+        try:
+            return self.driver.execute_script(SELECTED_FILTERS_JS, FILTER_SELECTOR)
+        except WebDriverException as e:
+            raise PageError(str(e))
+
+
+    # Lee las opciones (texto -> value) de temporada, conferencia y posicion de los desplegables, en una sola llamada.
+    # Se guardan como datos y no como WebElement, que dejan de ser validos cuando la pagina se vuelve a renderizar
+    def read_options(self):
+        try:
+            dropdowns = self.driver.execute_script(FILTER_OPTIONS_JS, FILTER_SELECTOR)
+        except WebDriverException as e:
+            raise PageError(f"No se pudieron leer los filtros.\n{e}")
+
+        for dropdown in dropdowns:
+            options = {opt["text"]: opt["value"] for opt in dropdown["options"]}
+            if dropdown["label"] == "SEASON":
+                # Obtenemos todas las temporadas
+                self.season_options = options
+            elif dropdown["label"] == "CONFERENCE":
+                # Obtenemos todas las conferencias
+                self.conference_options = {k: v for k, v in options.items() if k in ["East", "West"]}
+            elif dropdown["label"] == "POSITION":
+                # Obtenemos todas las posiciones de jugador
+                self.position_options = {k: v for k, v in options.items() if k in ["Center", "Guard", "Forward"]}
+
+
+    # Todas las combinaciones (temporada, conferencia, posicion) en el orden de los desplegables
+    def grid(self) -> list[tuple[str, str, str]]:
+        return [(s, c, p) for s in self.season_options for c in self.conference_options for p in self.position_options]
+
+
+    # Indica si los desplegables de la pagina tienen esa combinacion
+    def offers(self, season: str, conference: str, position: str) -> bool:
+        return season in self.season_options and conference in self.conference_options and position in self.position_options
+
+
+    # Selecciona por value una opcion del desplegable con esa etiqueta
+    def select_option(self, label: str, value: str):
+        try:
+            selected = self.driver.execute_script(SELECT_OPTION_JS, FILTER_SELECTOR, label, value)
+        except WebDriverException as e:
+            raise PageError(str(e))
+        if not selected:
+            raise FilterMismatchError(f"No se pudo seleccionar {value} en {label}")
+
+
+    # Pulsa "Get Stats"
+    def click_get_stats(self):
+        try:
+            found = self.driver.execute_script(BUTTON_JS, self.button_selector, "get stats", True)
+        except WebDriverException as e:
+            raise PageError(str(e))
+        if not found:
+            raise PageError("No se encontro el boton Get Stats.")
+
+
+    # Selecciona una combinacion de filtros, cambiando solo los desplegables que cambian
+    def select(self, season: str, conference: str, position: str):
+        if self.driver.current_window_handle != self.handle:
+            self.driver.switch_to.window(self.handle)
+
+        if season != self.selected[0]:
+            self.select_option("SEASON", self.season_options[season])
+            self.selected = (season, None, None)
+        if conference != self.selected[1]:
+            self.select_option("CONFERENCE", self.conference_options[conference])
+            self.selected = (season, conference, None)
+        self.select_option("POSITION", self.position_options[position])
+        self.selected = (season, conference, position)
+
+
+    # Url de la pagina con la combinacion de filtros como parametros
+    def filter_url(self, season: str, conference: str, position: str) -> str:
+        params = {
+            "Season": season,
+            "SeasonType": "Regular Season",
+            "Conference": conference,
+            "PlayerPosition": POSITIONS.get(position, position),
+        }
+        return f"{self.url}?{urlencode(params)}"
+
+
+    # Carga la combinacion por url y comprueba que los desplegables muestran los filtros pedidos
+    def load_by_url(self, season: str, conference: str, position: str):
+        if self.driver.current_window_handle != self.handle:
+            self.driver.switch_to.window(self.handle)
+
+        try:
+            self.driver.get(self.filter_url(season, conference, position))
+            # La pagina es nueva: basta con que la tabla exista y no haya indicador de carga
+            self.refresh_wait.wait_for_refresh(None)
+        except TimeoutException:
+            raise FilterMismatchError(f"La tabla no se cargo para {season} {conference} {position}")
+        except WebDriverException as e:
+            raise PageError(str(e))
+        self.check_filters(self.shown_filters(), season, conference, position)
+        self.selected = (season, conference, position)
+
+
+    # Comprueba que la pagina muestra los tres filtros pedidos: si la web ignora un parametro de la url, la tabla
+    # seria la de otra combinacion (p.ej. sin filtrar por conferencia)
+    def check_filters(self, shown: dict, season: str, conference: str, position: str):
+        expected = {"SEASON": season, "CONFERENCE": conference, "POSITION": position}
+        wrong = {k: shown.get(k) for k in expected if shown.get(k) != expected[k]}
+        if len(wrong) > 0:
+            raise FilterMismatchError(f"Los filtros mostrados {wrong} no coinciden con {season} {conference} {position}")
+
+
+    # Deja la pagina mostrando la tabla de la combinacion de filtros indicada
+    def apply(self, season: str, conference: str, position: str):
+        if self.navigation == "url":
+            self.load_by_url(season, conference, position)
+            return
+
+        self.select(season, conference, position)
+
+        # Huella de la tabla antes de aplicar los filtros, para detectar cuando se ha refrescado
+        table_before = self.refresh_wait.fingerprint()
+
+        # Aplicamos los filtros
+        self.click_get_stats()
+
+        # Esperamos a que el contenido de la tabla cambie (o termine de recargarse). Si no cambia, la tabla
+        # sigue siendo la de la combinacion anterior: se falla la combinacion para reintentarla
+        try:
+            self.refresh_wait.wait_for_refresh(table_before)
+        except TimeoutException:
+            raise FilterMismatchError(f"La tabla no cambio tras aplicar {season} {conference} {position}")
+
+
+    # Version no bloqueante de apply, para repartir combinaciones entre varias pestañas: start() lanza la carga,
+    # ready() indica si ya ha terminado y finish() comprueba el resultado. La pestaña debe estar activa (activate)
+    def activate(self):
+        try:
+            self.driver.switch_to.window(self.handle)
+        except WebDriverException as e:
+            raise PageError(str(e))
+
+
+    def start(self, season: str, conference: str, position: str):
+        self.pending = (season, conference, position)
+        self.seen_loading = False
+        if self.navigation == "url":
+            try:
+                # Marcamos el documento actual para no confundir su tabla con la de la pagina nueva
+                self.driver.execute_script("window.__staleStatsPage = true; window.location.href = arguments[0];",
+                                           self.filter_url(season, conference, position))
+            except WebDriverException as e:
+                raise PageError(str(e))
+            return
+
+        self.select(season, conference, position)
+        self.table_before = self.refresh_wait.fingerprint()
+        self.click_get_stats()
+
+
+    def ready(self) -> bool:
+        if self.navigation == "url":
+            try:
+                return bool(self.driver.execute_script(READY_JS, self.refresh_wait.tbody_selector, self.refresh_wait.loading_selector))
+            except WebDriverException:
+                # El documento esta cambiando mientras se ejecuta el script
+                return False
+
+        if self.refresh_wait.is_loading():
+            self.seen_loading = True
+            return False
+        current = self.refresh_wait.fingerprint()
+        return current is not None and (current != self.table_before or self.seen_loading)
+
+
+    # verify=False: no se comprueban los filtros mostrados (p.ej. si ya se ha comprobado la peticion a la api)
+    def finish(self, verify: bool = True):
+        season, conference, position = self.pending
+        self.pending = None
+        if self.navigation == "url" and verify:
+            self.check_filters(self.shown_filters(), season, conference, position)
+        self.selected = (season, conference, position)
+
+
+    # Olvida la combinacion seleccionada (tras un fallo no se sabe que muestran los desplegables),
+    # asi el siguiente select() vuelve a fijar los tres filtros
+    def reset(self):
+        self.selected = (None, None, None)
+        self.pending = None
+
+
+    # Indica si la pagina actual es una pagina de bloqueo en lugar de la de estadisticas
+    def blocked(self) -> bool:
+        try:
+            text = self.driver.execute_script(PAGE_TEXT_JS)
+        except WebDriverException:
+            return False
+        return any(marker in (text or "").lower() for marker in BLOCKED_MARKERS)
+
+
+    # Html de la pagina tal y como esta ahora
+    def read_html(self) -> str:
+        try:
+            return self.driver.page_source
+        except WebDriverException as e:
+            raise PageError(str(e))
+
+
+    # Tabla de la pagina tal y como esta ahora (JSON de TABLE_JS), extraida en el navegador
+    def read_table(self) -> str:
+        try:
+            content = self.driver.execute_script(TABLE_JS, self.table_selector)
+        except WebDriverException as e:
+            raise PageError(str(e))
+        if content is None:
+            raise ValueError(f"No se encontro la tabla para {' '.join(self.selected)}")
+        return content
@@ -0,0 +1,94 @@
+import time
+from collections import deque
+
+from stats_page import StatsPage
+
+
+# Reparte combinaciones de filtros entre varias pestañas de un mismo navegador.
+# Lanza la carga en todas las pestañas libres y va recogiendo la primera que termina, asi mientras una
+# pestaña espera a la red las demas avanzan, sin el coste en memoria de un navegador por worker.
+# tabs: pestañas ya abiertas de cada endpoint (sub_url -> [StatsPage, ...])
+class TabMultiplexer():
+
+    def __init__(self, tabs: dict[str, list[StatsPage]], timeout: float = 20, poll: float = 0.1):
+        self.tabs = tabs
+        self.timeout = timeout
+        self.poll = poll
+
+        self.latencies = []
+        self.timeouts = 0
+        self.max_busy = 0
+
+
+    # jobs: lista de (clave, sub_url, temporada, conferencia, posicion).
+    # before_start() se llama antes de lanzar cada carga (espera entre peticiones).
+    # harvest(job, page, error, elapsed) se llama al terminar cada carga, con la pestaña aun mostrando su tabla;
+    # error es None o la excepcion de la carga (al lanzarla, timeout o filtros que no coinciden) y elapsed lo que ha tardado.
+    # Los PageError (navegador caido) se propagan.
+    def run(self, jobs: list, harvest, before_start=None):
+        pending = deque(jobs)
+        free = {sub_url: deque(pages) for sub_url, pages in self.tabs.items()}
+        busy = []
+
+        while len(pending) > 0 or len(busy) > 0:
+            # Lanzamos la siguiente combinacion pendiente que tenga una pestaña libre de su endpoint
+            job = next((j for j in pending if len(free[j[1]]) > 0), None)
+            if job is not None:
+                pending.remove(job)
+                page = free[job[1]].popleft()
+                if before_start is not None:
+                    before_start()
+                page.activate()
+                started = time.monotonic()
+                try:
+                    page.start(*job[2:])
+                except ValueError as e:
+                    # Solo falla esta combinacion (p.ej. un desplegable sin la opcion pedida): la pestaña queda
+                    # libre, sin saber que muestran sus desplegables
+                    page.reset()
+                    free[job[1]].append(page)
+                    harvest(job, page, e, time.monotonic() - started)
+                    continue
+                busy.append((page, job, started))
+                self.max_busy = max(self.max_busy, len(busy))
+                # Mientras queden pestañas libres se siguen lanzando cargas antes de sondear
+                if any(len(free[j[1]]) > 0 for j in pending):
+                    continue
+
+            # Recogemos la primera pestaña que haya terminado
+            finished = False
+            for item in list(busy):
+                page, job, started = item
+                page.activate()
+                elapsed = time.monotonic() - started
+                error = None
+                if page.ready():
+                    self.latencies.append(elapsed)
+                    try:
+                        page.finish()
+                    except ValueError as e:
+                        error = e
+                elif elapsed > self.timeout:
+                    self.timeouts += 1
+                    page.pending = None
+                    error = ValueError(f"La tabla no se cargo en {self.timeout} segundos")
+                else:
+                    continue
+
+                busy.remove(item)
+                free[job[1]].append(page)
+                harvest(job, page, error, elapsed)
+                finished = True
+                break
+
+            if not finished:
+                time.sleep(self.poll)
+
+
+    def summary(self) -> str:
+        n_tabs = sum(len(pages) for pages in self.tabs.values())
+        if len(self.latencies) == 0:
+            return f"pestañas={n_tabs} cargas=0 timeouts={self.timeouts}"
+        mean = sum(self.latencies) / len(self.latencies)
+        return (f"pestañas={n_tabs} cargas={len(self.latencies)} timeouts={self.timeouts} "
+                f"media={mean:.2f}s max simultaneas={self.max_busy}")
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+
+# Columnas que identifican cada fila de las tablas de estadisticas
+ID_COLUMNS = ["Team", "Season", "Conference", "Position"]
+
+
+# Acumulador columnar para las filas de una tabla de estadisticas.
+# En lugar de hacer un pd.concat por cada <tr> (coste cuadratico en el numero de filas),
+# reservamos de antemano una lista para los equipos y una matriz float64 para las
+# estadisticas, las rellenamos en una sola pasada y construimos el DataFrame una unica vez.
+class TableBuilder():
+
+    def __init__(self, season: str, conference: str, position: str, categories: list[str], n_rows: int):
+        self.season = season
+        self.conference = conference
+        self.position = position
+        self.categories = list(categories)
+
+        self.teams = [None] * n_rows
+        self.stats = np.empty((n_rows, len(self.categories)), dtype=np.float64)
+        self.n_rows = 0
+
+
+    # Añade una fila (equipo + estadisticas en el mismo orden que categories)
+    def add_row(self, team_name: str, team_stats: list[float]):
+        # Si la tabla tiene mas filas de las esperadas, duplicamos la capacidad reservada
+        if self.n_rows == len(self.teams):
+            capacity = max(1, 2 * len(self.teams))
+            self.teams.extend([None] * (capacity - len(self.teams)))
+            self.stats = np.resize(self.stats, (capacity, len(self.categories)))
+
+        self.teams[self.n_rows] = team_name
+        self.stats[self.n_rows, :] = team_stats
+        self.n_rows += 1
+
+
+    # Construye el DataFrame final a partir de las columnas acumuladas
+    def to_dataframe(self) -> pd.DataFrame:
+        n = self.n_rows
+        # Las columnas identificativas se guardan como categoricas: Season/Conference/Position son
+        # constantes dentro de una tabla y Team se repite en cada combinacion de filtros
+        id_df = pd.DataFrame({
+            "Team": pd.Categorical(self.teams[:n]),
+            "Season": pd.Categorical([self.season] * n),
+            "Conference": pd.Categorical([self.conference] * n),
+            "Position": pd.Categorical([self.position] * n),
+        }, columns=ID_COLUMNS)
+        stats_df = pd.DataFrame(self.stats[:n], columns=self.categories)
+
+        return pd.concat([id_df, stats_df], axis=1)
+
+
+# Fija los tipos del dataset: identificativas como category y estadisticas como float64.
+# Hace falta tras pd.concat / pd.merge, que convierten a object las categoricas con categorias distintas
+def set_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None:
+        return None
+
+    dtypes = {}
+    for c in df.columns:
+        if c in ID_COLUMNS:
+            if not isinstance(df[c].dtype, pd.CategoricalDtype):
+                dtypes[c] = "category"
+        elif df[c].dtype != np.float64:
+            dtypes[c] = np.float64
+
+    return df.astype(dtypes) if len(dtypes) > 0 else df
+
+
+# Lee un csv del dataset con los tipos correctos (sin pasar por columnas object)
+def read_dataset(path: str, sep: str = ",") -> pd.DataFrame:
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    dtypes = {c: "category" if c in ID_COLUMNS else np.float64 for c in header}
+    return pd.read_csv(path, sep=sep, dtype=dtypes)
+
+
+# Memoria (MiB) que ocupa un DataFrame, incluyendo el contenido de las columnas object
+def memory_mib(df: pd.DataFrame) -> float:
+    return df.memory_usage(index=True, deep=True).sum() / 1024 / 1024
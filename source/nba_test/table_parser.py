@@ -0,0 +1,206 @@
+import hashlib
+import re
+
+import pandas as pd
+from bs4 import BeautifulSoup
+from lxml import etree, html as lxml_html
+
+from table_builder import TableBuilder
+
+
+# Clases de la tabla de estadisticas y de su fila de cabecera en nba.com/stats
+TABLE_CLASS = "Crom_table__p1iZz"
+HEADER_CLASS = "Crom_headers__mzI_m"
+
+# Inicio de la tabla de estadisticas dentro del html de la pagina
+TABLE_START = re.compile(r"<table\b[^>]*\bclass=\"[^\"]*\b" + TABLE_CLASS)
+
+# Atributos field de la cabecera, leidos directamente del html sin parsearlo
+HEADER_FIELD = re.compile(r"\bfield=\"([^\"]*)\"")
+
+# XPath precompilados sobre el fragmento de la tabla
+HEADER_CELLS = etree.XPath(f"./thead/tr[contains(concat(' ', normalize-space(@class), ' '), ' {HEADER_CLASS} ')]/th")
+BODY_ROWS = etree.XPath("./tbody/tr")
+ROW_CELLS = etree.XPath("./td")
+
+
+# Recorta del html solo el fragmento <table>...</table> de la tabla de estadisticas (None si no esta)
+def table_fragment(html: str) -> str:
+    match = TABLE_START.search(html)
+    if match is None:
+        return None
+    end = html.find("</table>", match.start())
+    if end < 0:
+        return None
+    return html[match.start():end + len("</table>")]
+
+
+# Hash de la cabecera de la tabla (secuencia de atributos field del thead), o None si no se encuentra
+def header_signature(html: str) -> str:
+    match = TABLE_START.search(html)
+    if match is None:
+        return None
+    end = html.find("</thead>", match.start())
+    if end < 0:
+        return None
+    fields = HEADER_FIELD.findall(html, match.start(), end)
+    if len(fields) == 0:
+        return None
+    return hashlib.sha1("|".join(fields).encode("utf-8")).hexdigest()[:16]
+
+
+# Plan de columnas ya resuelto para cada (endpoint, categorias de interes): que categorias salen y en que
+# indice de celda esta cada una. La cabecera de un endpoint no cambia entre combinaciones, asi que solo
+# se procesa la primera vez; si cambia su hash (rediseño de la web) se descarta el plan y se avisa.
+class ColumnPlanCache():
+
+    def __init__(self):
+        # (sub_url, categorias) -> (hash de la cabecera, categorias, indices)
+        self.plans = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+    # Plan guardado para esa cabecera, o None si no hay (o la cabecera ha cambiado)
+    def get(self, sub_url: str, cats_of_interest: list[str], signature: str) -> tuple[list[str], list[int]]:
+        entry = self.plans.get((sub_url, tuple(cats_of_interest)))
+        if entry is None or signature is None:
+            self.misses += 1
+            return None
+        if entry[0] != signature:
+            self.invalidations += 1
+            self.misses += 1
+            print(f"[WARN] La cabecera de la tabla de {sub_url} ha cambiado ({entry[0]} -> {signature}), se recalculan las columnas")
+            del self.plans[(sub_url, tuple(cats_of_interest))]
+            return None
+        self.hits += 1
+        return entry[1], entry[2]
+
+
+    # Resuelve y guarda el plan a partir de los campos de la cabecera
+    def put(self, sub_url: str, cats_of_interest: list[str], signature: str, fields: list[str]) -> tuple[list[str], list[int]]:
+        plan = column_plan(fields, cats_of_interest)
+        if signature is not None:
+            self.plans[(sub_url, tuple(cats_of_interest))] = (signature, plan[0], plan[1])
+        return plan
+
+
+    def summary(self) -> str:
+        return f"planes de columnas: {self.hits} reutilizados, {self.misses} calculados, {self.invalidations} invalidados"
+
+
+# Categorias de salida e indice de cada una dentro de los campos de la cabecera
+def column_plan(fields: list[str], cats_of_interest: list[str]) -> tuple[list[str], list[int]]:
+    if len(cats_of_interest) == 0:
+        return list(fields), list(range(len(fields)))
+    # Indices de las categorias de interes dentro de todas las categoria
+    return list(cats_of_interest), [fields.index(c) for c in cats_of_interest]
+
+
+# Parsers de la tabla: devuelven (campos de la cabecera, filas [equipo, celda, ...] como texto), o None si no
+# encuentran la tabla. "lxml" solo parsea el fragmento de la tabla; "bs4" parsea la pagina entera.
+# Con header=False no se procesa la cabecera (los campos se devuelven como None).
+def parse_table_lxml(html: str, header: bool = True) -> tuple[list[str], list[list[str]]]:
+    fragment = table_fragment(html)
+    if fragment is None:
+        return None
+    table = lxml_html.fragment_fromstring(fragment)
+
+    fields = None
+    if header:
+        header_cells = HEADER_CELLS(table)
+        if len(header_cells) == 0:
+            return None
+        fields = [th.get("field").lower() for th in header_cells[1:]]
+    rows = [[td.text_content().strip() for td in ROW_CELLS(tr)] for tr in BODY_ROWS(table)]
+    return fields, rows
+
+
+def parse_table_bs4(html: str, header: bool = True) -> tuple[list[str], list[list[str]]]:
+    # Creamos objeto BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Extraemos la tabla de estadisticas
+    teams_table = soup.find("table", class_=TABLE_CLASS)
+    if teams_table is None or teams_table.find("thead") is None:
+        return None
+
+    # Crom_headers__mzI_m -> Cabecera de la tabla
+    fields = None
+    if header:
+        fields = [col.get("field").lower() for col in teams_table.find("thead").find("tr", class_=HEADER_CLASS).find_all("th")[1:]]
+    rows = [[td.get_text().strip() for td in tr.find_all("td")] for tr in teams_table.find("tbody").find_all("tr")]
+    return fields, rows
+
+
+PARSERS = {
+    "lxml": parse_table_lxml,
+    "bs4": parse_table_bs4,
+}
+
+
+# Parsea la tabla con el parser indicado; si no la encuentra se vuelve a intentar con BeautifulSoup
+def parse_table(html: str, parser: str = "lxml", header: bool = True) -> tuple[list[str], list[list[str]]]:
+    parsed = PARSERS[parser](html, header=header)
+    if parsed is None and parser != "bs4":
+        print(f"[WARN] El parser {parser} no encontro la tabla, probando con BeautifulSoup")
+        parsed = parse_table_bs4(html, header=header)
+    if parsed is None:
+        raise ValueError(f"No se encontro la tabla {TABLE_CLASS} en la pagina")
+    return parsed
+
+
+# Extrae la tabla Crom_table__p1iZz del html de una pagina de nba.com/stats como DataFrame.
+# Con plans (y el sub_url del endpoint) se reutiliza el plan de columnas mientras la cabecera no cambie
+def get_table_contents(html, season: str, conference: str, position: str, cats_of_interest: list[str] = [], parser: str = "lxml",
+                       plans: ColumnPlanCache = None, sub_url: str = None) -> pd.DataFrame:
+    plan = None
+    if plans is not None:
+        signature = header_signature(html)
+        plan = plans.get(sub_url, cats_of_interest, signature)
+
+    if plan is None:
+        categories, rows = parse_table(html, parser=parser)
+        if plans is not None:
+            plan = plans.put(sub_url, cats_of_interest, signature, categories)
+        else:
+            plan = column_plan(categories, cats_of_interest)
+    else:
+        # Cabecera conocida: directamente a las celdas
+        _, rows = parse_table(html, parser=parser, header=False)
+    cats_of_interest, categories_idx = plan
+
+    builder = TableBuilder(season=season, conference=conference, position=position, categories=cats_of_interest, n_rows=len(rows))
+    for team_info in rows:
+        # Cogemos unicamente las estadisticas de interes
+        team_stats = [float(team_info[i + 1]) for i in categories_idx]
+
+        # Categorias y estadisticas deben tener la misma longitud, deberia cumplirse siempre
+        assert len(categories_idx) == len(team_stats)
+        builder.add_row(team_name=team_info[0], team_stats=team_stats)
+
+    return builder.to_dataframe()
+
+
+# Construye el DataFrame a partir de la tabla ya extraida en el navegador (JSON de stats_page.TABLE_JS):
+# {"fields": cabecera, "rows": [[equipo, valor, ...], ...]} con todas las columnas de la cabecera.
+# Los snapshots antiguos solo traen las columnas de "categories"
+def table_from_extract(data: dict, season: str, conference: str, position: str, cats_of_interest: list[str] = []) -> pd.DataFrame:
+    categories = data.get("categories", data["fields"])
+    if len(cats_of_interest) == 0:
+        cats_of_interest = categories
+
+    # Igual que list.index en get_table_contents: una categoria que no esta en la tabla es un error
+    missing = [c for c in cats_of_interest if c not in data["fields"] or c not in categories]
+    if len(missing) > 0:
+        raise ValueError(f"Categorias {missing} no encontradas en la tabla")
+    # Solo se convierten las columnas de interes
+    categories_idx = [categories.index(c) for c in cats_of_interest]
+
+    rows = data["rows"]
+    builder = TableBuilder(season=season, conference=conference, position=position, categories=cats_of_interest, n_rows=len(rows))
+    for row in rows:
+        builder.add_row(team_name=row[0], team_stats=[float(row[i + 1]) for i in categories_idx])
+
+    return builder.to_dataframe()
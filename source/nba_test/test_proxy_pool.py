@@ -0,0 +1,146 @@
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nba_final_scraper import NBAScraper, SCRAPING_PLAN
+from proxy_pool import ProxyPool, NoProxyError
+from rate_limiter import AdaptiveRateLimiter
+from robots_cache import RobotsCache
+from test_stats_api import ApiHandler
+
+
+# Abre las urls directamente, sin los proxies del entorno
+DIRECT = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+# Proxy de reenvio local: el cliente le pide la url absoluta y el la descarga del servidor de destino
+class ForwardProxyHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        ForwardProxyHandler.hits += 1
+        try:
+            with DIRECT.open(self.path, timeout=5) as response:
+                status, content_type, body = response.status, response.headers.get("Content-Type"), response.read()
+        except urllib.error.HTTPError as e:
+            status, content_type, body = e.code, e.headers.get("Content-Type"), e.read()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type or "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+# Proxy cuya IP de salida esta bloqueada: responde 403 a todo
+class BlockedProxyHandler(BaseHTTPRequestHandler):
+    hits = 0
+
+    def do_GET(self):
+        BlockedProxyHandler.hits += 1
+        self.send_error(403)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler) -> tuple[ThreadingHTTPServer, str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class ProxyPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.servers = []
+        for handler in [ApiHandler, ForwardProxyHandler, BlockedProxyHandler]:
+            server, url = serve(handler)
+            cls.servers.append(server)
+            setattr(cls, f"{handler.__name__}_url", url)
+        cls.api_url = f"{cls.ApiHandler_url}/stats/"
+        cls.good = cls.ForwardProxyHandler_url
+        cls.blocked = cls.BlockedProxyHandler_url
+
+    @classmethod
+    def tearDownClass(cls):
+        for server in cls.servers:
+            server.shutdown()
+            server.server_close()
+
+    def setUp(self):
+        ForwardProxyHandler.hits = 0
+        BlockedProxyHandler.hits = 0
+        self.limiter = AdaptiveRateLimiter(max_rate=1000)
+        self.scrapers = []
+
+    def tearDown(self):
+        for scraper in self.scrapers:
+            scraper.quit_driver()
+
+    def scraper(self, pool: ProxyPool) -> NBAScraper:
+        scraper = NBAScraper(user_agent="test", backend="http", api_url=self.api_url, limiter=self.limiter,
+                             robots=RobotsCache("test"), proxies=pool, max_attempts=3)
+        # Sin backoff entre reintentos
+        scraper.supervisor.base_delay = 0
+        self.scrapers.append(scraper)
+        return scraper
+
+    def test_blocked_proxy_is_evicted_and_replaced(self):
+        pool = ProxyPool([self.blocked, self.good], rate_per_proxy=1000, max_throttled=2)
+        scraper = self.scraper(pool)
+        # Sin usuarios, el primero de la lista
+        self.assertEqual(scraper.proxy.url, self.blocked)
+        self.assertEqual(scraper.api.session.proxies["http"], self.blocked)
+
+        df = scraper.extract_plan(SCRAPING_PLAN, combinations=[("2024-25", "East", "Guard")])
+
+        self.assertTrue(scraper.complete())
+        self.assertEqual(len(df), 2)
+        blocked, good = pool.proxies
+        self.assertTrue(blocked.evicted)
+        self.assertEqual(blocked.n_throttled, 2)
+        self.assertEqual(BlockedProxyHandler.hits, 2)
+        # La sesion http ha cambiado al proxy sano, que ha hecho el resto de peticiones
+        self.assertEqual(scraper.proxy.url, self.good)
+        self.assertEqual(scraper.api.session.proxies["http"], self.good)
+        self.assertEqual(scraper.api.session.proxies["https"], self.good)
+        self.assertEqual(ForwardProxyHandler.hits, 2)
+        self.assertEqual((blocked.users, good.users), (0, 1))
+
+        # Todas las peticiones han pasado por el limitador comun, ademas de por el de su proxy
+        self.assertEqual(self.limiter.n_requests, 4)
+        self.assertEqual(blocked.limiter.n_requests + good.limiter.n_requests, 4)
+
+        scraper.quit_driver()
+        self.assertEqual(good.users, 0)
+        self.assertIsNone(scraper.proxy)
+
+    def test_users_spread_over_healthy_proxies(self):
+        pool = ProxyPool([self.good, self.blocked], rate_per_proxy=1000)
+        first, second, third = [self.scraper(pool) for _ in range(3)]
+        self.assertEqual([first.proxy.url, second.proxy.url], [self.good, self.blocked])
+        self.assertEqual([p.users for p in pool.proxies], [2, 1])
+
+        second.quit_driver()
+        self.assertEqual([p.users for p in pool.proxies], [2, 0])
+        third.quit_driver()
+        self.assertEqual([p.users for p in pool.proxies], [1, 0])
+
+    def test_no_healthy_proxy_left(self):
+        pool = ProxyPool([self.blocked], rate_per_proxy=1000, max_throttled=1)
+        scraper = self.scraper(pool)
+        scraper.extract_plan(SCRAPING_PLAN, combinations=[("2024-25", "East", "Guard")])
+
+        self.assertTrue(pool.proxies[0].evicted)
+        self.assertFalse(scraper.complete())
+        self.assertRaises(NoProxyError, pool.acquire)
+
+
+if __name__ == "__main__":
+    unittest.main()
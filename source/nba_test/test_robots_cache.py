@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from robots_cache import RobotsCache
+
+
+ROBOTS_TXT = """User-agent: *
+Crawl-delay: 2
+Disallow: /private/
+"""
+
+USER_AGENT = "Mozilla/5.0 (test)"
+
+
+# Servidor local que sirve robots.txt con el status y el contenido que indique el test, y cuenta las peticiones
+class RobotsHandler(BaseHTTPRequestHandler):
+    status = 200
+    body = ROBOTS_TXT
+    hits = 0
+
+    def do_GET(self):
+        if self.path != "/robots.txt":
+            self.send_error(404)
+            return
+        RobotsHandler.hits += 1
+        body = RobotsHandler.body.encode("utf-8")
+        self.send_response(RobotsHandler.status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class RobotsCacheTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RobotsHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.host = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RobotsHandler.status = 200
+        RobotsHandler.body = ROBOTS_TXT
+        RobotsHandler.hits = 0
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "robots.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def url(self, sub_url: str) -> str:
+        return f"{self.host}{sub_url}"
+
+
+    def test_one_fetch_for_all_endpoints(self):
+        cache = RobotsCache(USER_AGENT, path=self.path)
+        for sub_url in ["/stats/teams/shooting", "/stats/teams/hustle", "/stats/teams/box-outs"]:
+            self.assertTrue(cache.can_fetch(self.url(sub_url)))
+        self.assertFalse(cache.can_fetch(self.url("/private/page")))
+        self.assertEqual(cache.min_interval(self.url("/stats/teams/shooting")), 2.0)
+        self.assertEqual(RobotsHandler.hits, 1)
+
+    def test_loads_from_disk(self):
+        RobotsCache(USER_AGENT, path=self.path).can_fetch(self.url("/stats/teams/shooting"))
+        self.assertEqual(RobotsHandler.hits, 1)
+
+        cache = RobotsCache(USER_AGENT, path=self.path)
+        self.assertTrue(cache.can_fetch(self.url("/stats/teams/hustle")))
+        self.assertFalse(cache.can_fetch(self.url("/private/page")))
+        self.assertEqual(RobotsHandler.hits, 1)
+
+    def test_refetch_after_ttl(self):
+        cache = RobotsCache(USER_AGENT, ttl=0.2, path=self.path)
+        cache.can_fetch(self.url("/stats/teams/shooting"))
+        cache.can_fetch(self.url("/stats/teams/hustle"))
+        self.assertEqual(RobotsHandler.hits, 1)
+
+        RobotsHandler.body = "User-agent: *\nDisallow: /\n"
+        time.sleep(0.3)
+        self.assertFalse(cache.can_fetch(self.url("/stats/teams/shooting")))
+        self.assertEqual(RobotsHandler.hits, 2)
+
+    def test_unauthorized_disallows_all(self):
+        for status in [401, 403]:
+            RobotsHandler.status = status
+            cache = RobotsCache(USER_AGENT)
+            self.assertFalse(cache.can_fetch(self.url("/stats/teams/shooting")), status)
+
+    def test_not_found_allows_all(self):
+        RobotsHandler.status = 404
+        cache = RobotsCache(USER_AGENT, path=self.path)
+        self.assertTrue(cache.can_fetch(self.url("/private/page")))
+        # Un 404 es definitivo: se guarda en disco como cualquier robots.txt
+        self.assertTrue(RobotsCache(USER_AGENT, path=self.path).can_fetch(self.url("/private/page")))
+        self.assertEqual(RobotsHandler.hits, 1)
+
+    def test_server_error_disallows_and_is_not_persisted(self):
+        RobotsHandler.status = 503
+        cache = RobotsCache(USER_AGENT, path=self.path, error_ttl=0.2)
+        self.assertFalse(cache.can_fetch(self.url("/stats/teams/shooting")))
+        self.assertFalse(cache.can_fetch(self.url("/stats/teams/hustle")))
+        self.assertEqual(RobotsHandler.hits, 1)
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), {})
+
+        # Cuando el servidor se recupera, se vuelve a pedir pasado error_ttl
+        RobotsHandler.status = 200
+        time.sleep(0.3)
+        self.assertTrue(cache.can_fetch(self.url("/stats/teams/shooting")))
+        self.assertEqual(RobotsHandler.hits, 2)
+
+        # Y otra ejecucion no hereda el error
+        RobotsHandler.status = 503
+        other = RobotsCache(USER_AGENT, path=self.path, error_ttl=0.2)
+        self.assertTrue(other.can_fetch(self.url("/stats/teams/box-outs")))
+        self.assertEqual(RobotsHandler.hits, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import json
+import os
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from stats_api import table_from_json, endpoint_table_from_json
+from table_builder import ID_COLUMNS, read_dataset
+from rate_limiter import AdaptiveRateLimiter
+from robots_cache import RobotsCache
+from nba_final_scraper import NBAScraper, SCRAPING_PLAN
+
+
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "dataset", "nba_test_dataset.csv")
+
+SHOT_CATEGORIES = ["Less Than 5 ft.", "5-9 ft.", "10-14 ft.", "15-19 ft.", "20-24 ft.", "25-29 ft.", "30-34 ft."]
+
+
+# Respuesta de leaguedashteamshotlocations: cabecera de dos niveles (rango de tiro + FGM/FGA/FG_PCT)
+def shot_locations(rows: list) -> dict:
+    return {"resultSets": {
+        "name": "ShotLocations",
+        "headers": [
+            {"name": "SHOT_CATEGORY", "columnsToSkip": 2, "columnSpan": 3, "columnNames": SHOT_CATEGORIES},
+            {"name": "columns", "columnNames": ["TEAM_ID", "TEAM_NAME"] + ["FGM", "FGA", "FG_PCT"] * len(SHOT_CATEGORIES)},
+        ],
+        "rowSet": rows,
+    }}
+
+
+# Respuesta de leaguehustlestatsteam: cabecera de un nivel, en una lista de resultSets
+def hustle(rows: list) -> dict:
+    return {"resultSets": [{
+        "name": "HustleStatsTeam",
+        "headers": ["TEAM_ID", "TEAM_NAME", "MIN", "CONTESTED_SHOTS_2PT", "CONTESTED_SHOTS_3PT", "OFF_BOXOUTS", "DEF_BOXOUTS"],
+        "rowSet": rows,
+    }]}
+
+
+SHOT_ROWS = [
+    [1, "Atlanta Hawks"] + [11.0, 16.7, 0.657] * len(SHOT_CATEGORIES),
+    [2, "Boston Celtics"] + [10.0, 15.0, 0.5] * len(SHOT_CATEGORIES),
+]
+HUSTLE_ROWS = [
+    [1, "Atlanta Hawks", 48, 13.9, 8.3, 0.8, 2.7],
+    [2, "Boston Celtics", 48, 17.1, None, 1.0, 3.8],
+]
+
+
+# Servidor local con la api de estadisticas: robots.txt y los dos endpoints del plan.
+# La temporada 1996-97 no tiene datos de hustle (rowSet vacio), como en la api real
+class ApiHandler(BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+        ApiHandler.requests.append((url.path, params))
+        if url.path == "/robots.txt":
+            self.reply("User-agent: *\nAllow: /\n", "text/plain")
+        elif url.path == "/stats/leaguedashteamshotlocations":
+            self.reply(json.dumps(shot_locations(SHOT_ROWS)), "application/json")
+        elif url.path == "/stats/leaguehustlestatsteam":
+            rows = [] if params.get("Season") == "1996-97" else HUSTLE_ROWS
+            self.reply(json.dumps(hustle(rows)), "application/json")
+        else:
+            self.send_error(404)
+
+    def reply(self, text: str, content_type: str):
+        body = text.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TableFromJsonTest(unittest.TestCase):
+
+    def test_two_level_shot_headers(self):
+        df = endpoint_table_from_json(shot_locations(SHOT_ROWS), "/teams/shooting", "2024-25", "East", "Guard")
+        # Solo los rangos de la tabla html (sin 30-34 ft.), con el nombre de columna de la web
+        self.assertEqual(len(df.columns), len(ID_COLUMNS) + 18)
+        self.assertIn("less than 5 ft. fg pct", df.columns)
+        self.assertIn("25-29 ft. fga", df.columns)
+        self.assertNotIn("30-34 ft. fgm", df.columns)
+        self.assertEqual(list(df["Team"]), ["Atlanta Hawks", "Boston Celtics"])
+        self.assertEqual(df.loc[0, "5-9 ft. fgm"], 11.0)
+
+    def test_pct_scaled_to_percent(self):
+        df = endpoint_table_from_json(shot_locations(SHOT_ROWS), "/teams/shooting", "2024-25", "East", "Guard")
+        self.assertAlmostEqual(df.loc[0, "less than 5 ft. fg pct"], 65.7)
+        self.assertAlmostEqual(df.loc[1, "10-14 ft. fg pct"], 50.0)
+        # Las columnas que no son porcentajes no se escalan
+        self.assertAlmostEqual(df.loc[0, "less than 5 ft. fga"], 16.7)
+
+    def test_missing_values_are_nan(self):
+        df = table_from_json(hustle(HUSTLE_ROWS), "2024-25", "East", "Guard", ["contested_shots_2pt", "contested_shots_3pt"])
+        self.assertEqual(df.loc[0, "contested_shots_3pt"], 8.3)
+        self.assertTrue(df["contested_shots_3pt"].isna()[1])
+
+    def test_empty_row_set(self):
+        df = table_from_json(hustle([]), "1996-97", "East", "Guard", ["off_boxouts", "def_boxouts"])
+        self.assertEqual(len(df), 0)
+        self.assertEqual(list(df.columns), ID_COLUMNS + ["off_boxouts", "def_boxouts"])
+
+
+class HttpBackendTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.api_url = f"http://127.0.0.1:{cls.server.server_address[1]}/stats/"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ApiHandler.requests = []
+        self.scraper = NBAScraper(user_agent="test", backend="http", api_url=self.api_url,
+                                  limiter=AdaptiveRateLimiter(max_rate=1000), robots=RobotsCache("test"), max_attempts=1)
+
+    def tearDown(self):
+        self.scraper.quit_driver()
+
+    def test_extract_plan_matches_dataset(self):
+        combinations = [("2024-25", "East", "Forward"), ("2024-25", "West", "Center"), ("1996-97", "East", "Guard")]
+        df = self.scraper.extract_plan(SCRAPING_PLAN, combinations=combinations)
+
+        self.assertTrue(self.scraper.complete())
+        self.assertEqual(list(df.columns), list(read_dataset(DATASET_PATH).columns))
+        for c in df.columns:
+            self.assertEqual(str(df[c].dtype), "category" if c in ID_COLUMNS else "float64", c)
+
+        # Dos equipos por combinacion, en el orden del grid; sin hustle en 1996-97 sus columnas quedan vacias
+        self.assertEqual(len(df), 6)
+        self.assertEqual(list(df["Season"].astype(str)), ["2024-25"] * 4 + ["1996-97"] * 2)
+        self.assertTrue(df.loc[df["Season"] == "1996-97", "contested_shots_2pt"].isna().all())
+        self.assertEqual(df.loc[0, "off_boxouts"], 0.8)
+
+    def test_filters_sent_as_api_params(self):
+        self.scraper.extract_plan(SCRAPING_PLAN, combinations=[("2023-24", "West", "Center")])
+        sent = [params for path, params in ApiHandler.requests if path != "/robots.txt"]
+        # hustle y box-outs comparten peticion: una por endpoint de la api
+        self.assertEqual(len(sent), 2)
+        for params in sent:
+            self.assertEqual((params["Season"], params["Conference"], params["PlayerPosition"]), ("2023-24", "West", "C"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import time
+import unittest
+
+from checkpoint_store import CheckpointStore
+from nba_final_scraper import SCRAPING_PLAN, enqueue_plan, finalize_queue
+from stats_api import endpoint_table_from_json
+from table_builder import ID_COLUMNS
+from test_stats_api import shot_locations, hustle, SHOT_ROWS, HUSTLE_ROWS
+from work_queue import WorkQueue, Heartbeat
+
+
+GRID = [("2024-25", "East", "Forward"), ("2024-25", "East", "Center")]
+
+JOB = ("/teams/shooting", "2024-25", "East", "Forward")
+
+
+class WorkQueueTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "queue.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def queue(self, **kwargs) -> WorkQueue:
+        return WorkQueue(self.path, **kwargs)
+
+
+    def test_enqueue_plan_once(self):
+        queue = self.queue()
+        self.assertEqual(enqueue_plan(queue, grid=GRID), len(GRID) * len(SCRAPING_PLAN))
+        # Volver a encolar (p.ej. otro coordinador) no duplica trabajos
+        self.assertEqual(enqueue_plan(queue, grid=GRID), 0)
+        self.assertEqual(queue.combinations(), GRID)
+        self.assertEqual(queue.counts(), {"pending": 6})
+
+    def test_lease_batches_one_endpoint(self):
+        queue = self.queue()
+        enqueue_plan(queue, grid=GRID)
+        jobs = queue.lease("w1", n=4)
+        # En orden del dataset pero solo del endpoint del primer trabajo libre
+        self.assertEqual(jobs, [("/teams/shooting",) + k for k in GRID])
+        self.assertEqual(queue.lease("w2", n=4), [("/teams/hustle",) + k for k in GRID])
+        self.assertEqual(queue.counts(), {"pending": 2, "leased": 4})
+
+    def test_expired_lease_taken_by_other_worker(self):
+        queue = self.queue(lease_seconds=0.2)
+        queue.enqueue([JOB])
+        self.assertEqual(queue.lease("w1"), [JOB])
+        # Mientras el lease este vigente nadie mas lo coge
+        self.assertEqual(queue.lease("w2"), [])
+
+        time.sleep(0.3)
+        self.assertEqual(queue.lease("w2"), [JOB])
+        # El worker que lo perdio ya no puede renovarlo ni fallarlo, pero si completarlo (el resultado es el mismo)
+        self.assertEqual(queue.heartbeat("w1", [JOB]), 0)
+        queue.fail("w1", JOB, "tarde")
+        self.assertEqual(queue.jobs_in_state("leased"), [JOB])
+        queue.complete("w1", JOB)
+        self.assertEqual(queue.counts(), {"done": 1})
+        self.assertEqual(queue.unfinished(), 0)
+
+    def test_expired_lease_without_attempts_left_fails(self):
+        queue = self.queue(lease_seconds=0.1, max_attempts=1)
+        queue.enqueue([JOB])
+        queue.lease("w1")
+        time.sleep(0.2)
+        self.assertEqual(queue.lease("w2"), [])
+        self.assertEqual(queue.jobs_in_state("failed"), [JOB])
+
+    def test_fail_returns_to_pending_then_failed(self):
+        queue = self.queue(max_attempts=2)
+        queue.enqueue([JOB])
+
+        queue.lease("w1")
+        queue.fail("w1", JOB, "timeout")
+        self.assertEqual(queue.jobs_in_state("pending"), [JOB])
+
+        self.assertEqual(queue.lease("w2"), [JOB])
+        queue.fail("w2", JOB, "timeout")
+        self.assertEqual(queue.jobs_in_state("failed"), [JOB])
+        self.assertEqual(queue.lease("w3"), [])
+        self.assertEqual(queue.unfinished(), 0)
+        self.assertEqual(queue.summary(), "pending=0 leased=0 done=0 failed=1")
+
+    def test_heartbeat_renews_leases(self):
+        queue = self.queue(lease_seconds=0.3)
+        queue.enqueue([JOB])
+        jobs = queue.lease("w1")
+        with Heartbeat(queue, "w1", jobs, interval=0.05):
+            # Mas que el lease: sin heartbeat ya lo habria cogido otro worker
+            time.sleep(0.6)
+            self.assertEqual(queue.lease("w2"), [])
+        self.assertEqual(queue.jobs_in_state("leased"), [JOB])
+
+        # Sin heartbeat el lease caduca
+        time.sleep(0.4)
+        self.assertEqual(queue.lease("w2"), [JOB])
+
+    def test_finalize_queue_leaves_failed_jobs_empty(self):
+        queue = self.queue(max_attempts=1)
+        results = CheckpointStore(os.path.join(self.tmp.name, "results"))
+        enqueue_plan(queue, grid=GRID)
+
+        # Todo termina salvo box-outs de la segunda combinacion
+        while True:
+            jobs = queue.lease("w1", n=len(GRID))
+            if len(jobs) == 0:
+                break
+            for job in jobs:
+                sub_url, season, conf, pos = job
+                if job == ("/teams/box-outs",) + GRID[1]:
+                    queue.fail("w1", job, "timeout")
+                    continue
+                data = shot_locations(SHOT_ROWS) if sub_url == "/teams/shooting" else hustle(HUSTLE_ROWS)
+                cats_of_interest = dict(SCRAPING_PLAN)[sub_url]
+                results.save(sub_url, season, conf, pos, endpoint_table_from_json(data, sub_url, season, conf, pos, cats_of_interest))
+                queue.complete("w1", job)
+
+        df = finalize_queue(queue, results)
+        self.assertEqual(queue.counts(), {"done": 5, "failed": 1})
+        self.assertEqual(len(df), 4)
+        self.assertEqual([tuple(k) for k in df[ID_COLUMNS[1:]].astype(str).drop_duplicates().values], GRID)
+        boxouts = dict(SCRAPING_PLAN)["/teams/box-outs"]
+        first = df["Position"] == "Forward"
+        self.assertTrue(df.loc[first, boxouts].notna().all().all())
+        self.assertTrue(df.loc[~first, boxouts].isna().all().all())
+        # Las columnas de los endpoints que si terminaron estan completas
+        self.assertTrue(df.loc[~first, "contested_shots_2pt"].notna().all())
+
+
+if __name__ == "__main__":
+    unittest.main()
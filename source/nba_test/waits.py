@@ -0,0 +1,117 @@
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+# Huella (hash djb2) del contenido del tbody de la tabla de estadisticas, calculada en el navegador
+# para no traer todo el texto de la tabla en cada sondeo. Devuelve null si la tabla aun no existe.
+FINGERPRINT_JS = """
+const body = document.querySelector(arguments[0]);
+if (!body) { return null; }
+const text = body.innerText;
+let h = 5381;
+for (let i = 0; i < text.length; i++) { h = ((h << 5) + h + text.charCodeAt(i)) | 0; }
+return text.length + ':' + h;
+"""
+
+# Indica si hay algun indicador de carga visible en la pagina
+LOADING_JS = """
+for (const el of document.querySelectorAll(arguments[0])) {
+    if (el.offsetParent !== null) { return true; }
+}
+return false;
+"""
+
+# Textos de las etiquetas de los desplegables de filtros presentes en la pagina
+FILTER_LABELS_JS = """
+return Array.from(document.querySelectorAll(arguments[0])).map(p => p.innerText.trim().toUpperCase());
+"""
+
+
+# Espera basada en eventos para el refresco de la tabla tras pulsar "Get Stats".
+# Antes del click se toma la huella del tbody; despues se sondea hasta que la huella cambia
+# y no queda ningun indicador de carga visible, con un timeout maximo.
+# Guarda la latencia observada de cada refresco para poder ver cuanto tarda realmente la web.
+class TableRefreshWait():
+
+    def __init__(self, driver, timeout: float = 20, poll: float = 0.1,
+                 tbody_selector: str = "table.Crom_table__p1iZz tbody",
+                 loading_selector: str = "[class*='Loader'], [class*='loading'], [class*='Spinner']"):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll = poll
+        self.tbody_selector = tbody_selector
+        self.loading_selector = loading_selector
+
+        self.latencies = []
+        self.timeouts = 0
+
+
+    def fingerprint(self) -> str:
+        try:
+            return self.driver.execute_script(FINGERPRINT_JS, self.tbody_selector)
+        except WebDriverException:
+            return None
+
+
+    def is_loading(self) -> bool:
+        try:
+            return bool(self.driver.execute_script(LOADING_JS, self.loading_selector))
+        except WebDriverException:
+            return False
+
+
+    # Espera a que la tabla cambie respecto a la huella `before`. Devuelve la latencia en segundos
+    def wait_for_refresh(self, before: str) -> float:
+        start = time.monotonic()
+        seen_loading = False
+
+        while True:
+            elapsed = time.monotonic() - start
+            loading = self.is_loading()
+            seen_loading = seen_loading or loading
+
+            if not loading:
+                current = self.fingerprint()
+                # La tabla ha cambiado, o se ha recargado (aparecio el indicador de carga) con el mismo contenido
+                if current is not None and (current != before or seen_loading):
+                    self.latencies.append(elapsed)
+                    return elapsed
+
+            if elapsed > self.timeout:
+                self.timeouts += 1
+                raise TimeoutException(f"La tabla no se refresco en {self.timeout} segundos")
+
+            time.sleep(self.poll)
+
+
+    # Espera a que aparezcan los desplegables con las etiquetas indicadas (p.ej. tras abrir los filtros avanzados)
+    def wait_for_filters(self, labels: list[str], label_selector: str = ".nba-stats-primary-split-block .DropDown_label__lttfI p") -> float:
+        start = time.monotonic()
+        wanted = {label.upper() for label in labels}
+
+        while True:
+            elapsed = time.monotonic() - start
+            try:
+                present = set(self.driver.execute_script(FILTER_LABELS_JS, label_selector))
+            except WebDriverException:
+                present = set()
+
+            if wanted.issubset(present):
+                return elapsed
+
+            if elapsed > self.timeout:
+                raise TimeoutException(f"No aparecieron los filtros {sorted(wanted - present)}")
+
+            time.sleep(self.poll)
+
+
+    def summary(self) -> str:
+        if len(self.latencies) == 0:
+            return f"refrescos=0 timeouts={self.timeouts}"
+
+        latencies = sorted(self.latencies)
+        mean = sum(latencies) / len(latencies)
+        p95 = latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+        return (f"refrescos={len(latencies)} timeouts={self.timeouts} "
+                f"media={mean:.2f}s p95={p95:.2f}s max={latencies[-1]:.2f}s")
@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Cola de trabajos (endpoint, temporada, conferencia, posicion) en SQLite, para repartir el grid entre
+# varios procesos o maquinas que vean el mismo fichero.
+# Cada worker coge trabajos con un lease de lease_seconds y lo va renovando (heartbeat) mientras trabaja;
+# si el worker muere, el lease caduca y otro worker vuelve a coger esos trabajos.
+# Un trabajo que falla vuelve a quedar pendiente hasta max_attempts intentos, y despues queda como "failed".
+# Estados: pending, leased, done, failed.
+class WorkQueue():
+
+    def __init__(self, path: str, lease_seconds: float = 300, max_attempts: int = 3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self.connect() as db:
+            # WAL: los lectores no bloquean al que escribe
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sub_url TEXT NOT NULL,
+                    season TEXT NOT NULL,
+                    conference TEXT NOT NULL,
+                    position TEXT NOT NULL,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    worker TEXT,
+                    lease_until REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    UNIQUE (sub_url, season, conference, position)
+                )
+            """)
+
+
+    # Una conexion por operacion: asi se puede usar desde varios hilos (el del heartbeat y el del worker).
+    # Si algo falla a mitad de una transaccion, al cerrar la conexion se deshace
+    @contextmanager
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            yield db
+        finally:
+            db.close()
+
+
+    # Añade los trabajos que no esten ya en la cola (en orden: el de seq es el orden del dataset)
+    def enqueue(self, jobs: list[tuple[str, str, str, str]]) -> int:
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO jobs (sub_url, season, conference, position) VALUES (?, ?, ?, ?)", jobs)
+            db.execute("COMMIT")
+            return db.total_changes - before
+
+
+    # Coge hasta n trabajos libres (pendientes o con el lease caducado) de un mismo endpoint,
+    # asi el worker solo tiene que abrir una pagina por lote
+    def lease(self, worker: str, n: int = 1) -> list[tuple[str, str, str, str]]:
+        now = time.time()
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            # Los leases caducados que ya han agotado sus intentos no se vuelven a repartir
+            db.execute("UPDATE jobs SET state = 'failed', error = 'lease caducado' WHERE state = 'leased' AND lease_until < ? AND attempts >= ?",
+                       (now, self.max_attempts))
+            free = "(state = 'pending' OR (state = 'leased' AND lease_until < ?))"
+            first = db.execute(f"SELECT sub_url FROM jobs WHERE {free} ORDER BY seq LIMIT 1", (now,)).fetchone()
+            if first is None:
+                db.execute("COMMIT")
+                return []
+            rows = db.execute(f"SELECT seq, sub_url, season, conference, position FROM jobs WHERE {free} AND sub_url = ? ORDER BY seq LIMIT ?",
+                              (now, first[0], n)).fetchall()
+            db.executemany("UPDATE jobs SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE seq = ?",
+                           [(worker, now + self.lease_seconds, row[0]) for row in rows])
+            db.execute("COMMIT")
+        return [tuple(row[1:]) for row in rows]
+
+
+    # Renueva el lease de los trabajos del worker. Devuelve cuantos seguian siendo suyos
+    def heartbeat(self, worker: str, jobs: list[tuple[str, str, str, str]]) -> int:
+        lease_until = time.time() + self.lease_seconds
+        with self.connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            renewed = 0
+            for job in jobs:
+                cursor = db.execute("UPDATE jobs SET lease_until = ? WHERE state = 'leased' AND worker = ? AND sub_url = ? AND season = ? AND conference = ? AND position = ?",
+                                    (lease_until, worker) + tuple(job))
+                renewed += cursor.rowcount
+            db.execute("COMMIT")
+            return renewed
+
+
+    # El resultado del trabajo ya esta escrito (aunque el lease hubiera caducado, el resultado es el mismo)
+    def complete(self, worker: str, job: tuple[str, str, str, str]):
+        with self.connect() as db:
+            db.execute("UPDATE jobs SET state = 'done', worker = ?, lease_until = NULL, error = NULL WHERE sub_url = ? AND season = ? AND conference = ? AND position = ?",
+                       (worker,) + tuple(job))
+
+
+    # El trabajo ha fallado: vuelve a quedar pendiente, o como fallido si ya ha agotado sus intentos
+    def fail(self, worker: str, job: tuple[str, str, str, str], error: str):
+        with self.connect() as db:
+            db.execute("""UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, lease_until = NULL, error = ?
+                          WHERE state = 'leased' AND worker = ? AND sub_url = ? AND season = ? AND conference = ? AND position = ?""",
+                       (self.max_attempts, error, worker) + tuple(job))
+
+
+    # Combinaciones (temporada, conferencia, posicion) en el orden en que se encolaron
+    def combinations(self) -> list[tuple[str, str, str]]:
+        with self.connect() as db:
+            rows = db.execute("SELECT season, conference, position FROM jobs GROUP BY season, conference, position ORDER BY MIN(seq)").fetchall()
+        return [tuple(row) for row in rows]
+
+
+    def jobs_in_state(self, state: str) -> list[tuple[str, str, str, str]]:
+        with self.connect() as db:
+            rows = db.execute("SELECT sub_url, season, conference, position FROM jobs WHERE state = ? ORDER BY seq", (state,)).fetchall()
+        return [tuple(row) for row in rows]
+
+
+    def counts(self) -> dict[str, int]:
+        with self.connect() as db:
+            return dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+
+    # Quedan trabajos por hacer (pendientes o en manos de algun worker)
+    def unfinished(self) -> int:
+        counts = self.counts()
+        return counts.get("pending", 0) + counts.get("leased", 0)
+
+
+    def summary(self) -> str:
+        counts = self.counts()
+        return " ".join(f"{state}={counts.get(state, 0)}" for state in ["pending", "leased", "done", "failed"])
+
+
+# Hilo que renueva los leases de un lote de trabajos mientras el worker lo procesa
+# (with Heartbeat(queue, worker, jobs): ...)
+class Heartbeat():
+
+    def __init__(self, queue: WorkQueue, worker: str, jobs: list, interval: float = None):
+        self.queue = queue
+        self.worker = worker
+        self.jobs = jobs
+        self.interval = queue.lease_seconds / 3 if interval is None else interval
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+
+
+    def loop(self):
+        while not self.stop.wait(self.interval):
+            renewed = self.queue.heartbeat(self.worker, self.jobs)
+            if renewed < len(self.jobs):
+                print(f"[WARN] {self.worker}: {len(self.jobs) - renewed} trabajos han perdido el lease")
+
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        return False